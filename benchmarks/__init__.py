@@ -0,0 +1,5 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Benchmarks for the Docrepr package."""
@@ -0,0 +1,149 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Benchmarks of docrepr's rendering functions, to be run with asv.
+
+Docstrings come from a fixed corpus vendored in ``corpus.json``, so results
+can be compared across commits. It contains real docstrings from the
+standard library, Sphinx, NumPy and Matplotlib, grouped by kind: plain
+stdlib docstrings, Sphinx-style docstrings with ``:param:`` fields,
+NumPy-style docstrings, math-heavy and plot-containing docstrings and very
+large ones.
+
+Cold benchmarks render a docstring with fresh renderers and empty caches,
+as the first time an object is inspected, while warm ones reuse the
+renderers created by a previous render.
+"""
+
+# Stdlib imports
+import json
+import os.path as osp
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+# Local imports
+import docrepr.sphinxify
+from docrepr.sphinxify import render_cache
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+CORPUS_PATH = osp.join(osp.dirname(__file__), 'corpus.json')
+
+with open(CORPUS_PATH, encoding='utf-8') as corpus_file:
+    CORPUS = {oinfo['name']: oinfo for oinfo in json.load(corpus_file)}
+
+NAMES = list(CORPUS)
+
+
+#-----------------------------------------------------------------------------
+# Benchmarks
+#-----------------------------------------------------------------------------
+class RenderBenchmark:
+    """Base class of the benchmarks, which render in their own cache dir."""
+
+    timeout = 300
+
+    def setup(self, *params):
+        self.original_cachedir = docrepr.sphinxify.CACHEDIR
+        self.cachedir = tempfile.mkdtemp(prefix='docrepr-benchmark-')
+        docrepr.sphinxify.CACHEDIR = self.cachedir
+        docrepr.sphinxify.reset_renderers()
+        render_cache.clear()
+
+    def teardown(self, *params):
+        docrepr.sphinxify.reset_renderers()
+        render_cache.clear()
+        docrepr.sphinxify.CACHEDIR = self.original_cachedir
+        shutil.rmtree(self.cachedir, ignore_errors=True)
+
+
+class ColdRender(RenderBenchmark):
+    """Latency of the first render, including creating the renderers."""
+
+    params = NAMES
+    param_names = ['docstring']
+
+    # Every sample needs fresh renderers, created in setup
+    number = 1
+    repeat = (3, 10, 60.0)
+    warmup_time = 0
+
+    def time_sphinxify(self, name):
+        docrepr.sphinxify.sphinxify(CORPUS[name]['docstring'])
+
+    def time_rich_repr(self, name):
+        docrepr.sphinxify.rich_repr(CORPUS[name])
+
+
+class WarmRender(RenderBenchmark):
+    """Latency of renders that reuse the renderers of a previous one."""
+
+    params = NAMES
+    param_names = ['docstring']
+
+    def setup(self, name):
+        super().setup(name)
+        docrepr.sphinxify.sphinxify(CORPUS[name]['docstring'])
+        docrepr.sphinxify.rich_repr(CORPUS[name])
+
+    def time_sphinxify(self, name):
+        render_cache.clear()
+        docrepr.sphinxify.sphinxify(CORPUS[name]['docstring'])
+
+    def time_rich_repr(self, name):
+        render_cache.clear()
+        docrepr.sphinxify.rich_repr(CORPUS[name])
+
+    def time_rich_repr_cached(self, name):
+        docrepr.sphinxify.rich_repr(CORPUS[name])
+
+    def time_sphinxify_text(self, name):
+        docrepr.sphinxify.sphinxify_text(CORPUS[name]['docstring'], 79)
+
+
+class Throughput(RenderBenchmark):
+    """Docstrings of the whole corpus rendered per second."""
+
+    unit = 'docstrings/s'
+
+    def setup(self):
+        super().setup()
+        docrepr.sphinxify.rich_repr_many(CORPUS)
+        render_cache.clear()
+
+    def track_rich_repr(self):
+        start = time.perf_counter()
+        for oinfo in CORPUS.values():
+            docrepr.sphinxify.rich_repr(oinfo)
+        return len(CORPUS) / (time.perf_counter() - start)
+
+    def track_rich_repr_many(self):
+        start = time.perf_counter()
+        docrepr.sphinxify.rich_repr_many(CORPUS)
+        return len(CORPUS) / (time.perf_counter() - start)
+
+
+class Memory(RenderBenchmark):
+    """Peak memory used to render the whole corpus from a cold start."""
+
+    def peakmem_rich_repr(self):
+        for oinfo in CORPUS.values():
+            docrepr.sphinxify.rich_repr(oinfo)
+
+    def track_rich_repr_allocated(self):
+        """Peak size of the Python objects allocated while rendering."""
+        tracemalloc.start()
+        try:
+            for oinfo in CORPUS.values():
+                docrepr.sphinxify.rich_repr(oinfo)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    track_rich_repr_allocated.unit = 'bytes'
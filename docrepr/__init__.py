@@ -19,8 +19,22 @@
 # Configuration options for docrepr
 options = {
     'render_math': True,
+    'mathml': False,
     'local_mathjax': False,
     'collapse_sections': False,
     'use_qt4': False,
-    'outline': False
+    'outline': False,
+    'legacy_assets': True,
+    'inline_assets': False,
+    'docutils_fast_path': True,
+    'cache_size': 128,
+    'disk_cache': False,
+    'cache_max_size': 256 * 1024 ** 2,
+    'cache_max_age': 7 * 24 * 60 * 60,
+    'doctree_cache_size': 64,
+    'render_processes': None,
+    'max_renders_per_process': 200,
+    'concurrent_class_docstring': False,
+    'render_server': True,
+    'template_bytecode_cache': False,
 }
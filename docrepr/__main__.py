@@ -0,0 +1,99 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Command line interface of docrepr, run with ``python -m docrepr``."""
+
+# Stdlib imports
+import argparse
+import functools
+import importlib.util
+import sys
+
+
+def _print_progress(package, done, total):
+    print('\r%s: %d/%d objects' % (package, done, total), end='',
+          file=sys.stderr, flush=True)
+
+
+def prerender_packages(packages, processes=None):
+    """
+    Render the public objects of packages into the on-disk render cache.
+
+    Returns whether they could all be rendered.
+    """
+    from . import options
+    from .prerender import build_oinfos, prerender, public_objects
+
+    if importlib.util.find_spec('IPython') is None:
+        print('IPython is needed to inspect objects; install it with '
+              '`pip install docrepr[prerender]`', file=sys.stderr)
+        return False
+
+    options['disk_cache'] = True
+    success = True
+    for package in packages:
+        try:
+            objects = public_objects(package)
+        except ImportError as error:
+            print('%s: %s' % (package, error), file=sys.stderr)
+            success = False
+            continue
+        result = prerender(
+            build_oinfos(objects), processes,
+            functools.partial(_print_progress, package))
+        print(' (%d rendered, %d already cached, %d failed)' % (
+            result['rendered'], result['cached'], len(result['failed'])),
+            file=sys.stderr)
+        for name in result['failed']:
+            print('  Failed to render ' + name, file=sys.stderr)
+        success = success and not result['failed']
+    return success
+
+
+def main(argv=None):
+    """Run a docrepr command, returning its exit status."""
+    parser = argparse.ArgumentParser(prog='python -m docrepr')
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve_parser = subparsers.add_parser(
+        'serve', help='run a render server shared by other processes')
+    serve_parser.add_argument(
+        '--port', type=int, default=0,
+        help='port to listen on, on localhost (default: any free port)')
+    serve_parser.add_argument(
+        '--cachedir',
+        help='cache directory to render in and advertise the server on')
+    serve_parser.add_argument(
+        '--verbose', action='store_true', help='log every request')
+
+    prerender_parser = subparsers.add_parser(
+        'prerender',
+        help='render the public objects of packages into the disk cache')
+    prerender_parser.add_argument(
+        'packages', nargs='+', metavar='package',
+        help='package or module to render, e.g. numpy')
+    prerender_parser.add_argument(
+        '--processes', type=int,
+        help='number of worker processes (default: the number of CPUs)')
+    prerender_parser.add_argument(
+        '--cachedir', help='cache directory to render in')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        from .server import serve
+        serve(args.port, args.cachedir, args.verbose)
+    elif args.command == 'prerender':
+        if args.cachedir is not None:
+            from . import sphinxify
+            sphinxify.CACHEDIR = args.cachedir
+        if not prerender_packages(args.packages, args.processes):
+            return 1
+    else:
+        parser.print_help()
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
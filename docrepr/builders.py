@@ -0,0 +1,170 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Sphinx builders and projects used by the persistent docrepr renderers."""
+
+# Stdlib imports
+import functools
+import pickle
+
+# 3rd party imports
+from sphinx.builders.html import StandaloneHTMLBuilder
+from sphinx.builders.text import TextBuilder
+from sphinx.project import Project
+
+
+#-----------------------------------------------------------------------------
+# Projects
+#-----------------------------------------------------------------------------
+@functools.lru_cache()
+def _memory_path_class(path_class):
+    class MemoryPath(path_class):
+        """Path of a source that only exists in memory, read as empty."""
+
+        def read_text(self, *args, **kwargs):
+            return ''
+
+    return MemoryPath
+
+
+class MemoryProject(Project):
+    """
+    Project whose documents are kept in memory instead of the source dir.
+
+    Their sources are read as empty, so they must be passed to Sphinx in
+    the ``source-read`` event. This needs Sphinx 9 or newer, which reads
+    sources through the paths returned by `doc2path`.
+
+    Parameters
+    ----------
+    srcdir : str
+        The source dir.
+
+    source_suffix : dict
+        The ``source_suffix`` config value.
+
+    documents : container of str
+        Names of the documents kept in memory. It's used as is, so documents
+        added to or removed from it are found by the next build.
+    """
+
+    def __init__(self, srcdir, source_suffix, documents):
+        super().__init__(srcdir, source_suffix)
+        self.documents = documents
+
+    def discover(self, *args, **kwargs):
+        docnames = super().discover(*args, **kwargs)
+        docnames.update(self.documents)
+        return docnames
+
+    def doc2path(self, docname, *args, **kwargs):
+        path = super().doc2path(docname, *args, **kwargs)
+        if docname in self.documents:
+            path = _memory_path_class(type(path))(path)
+        return path
+
+
+#-----------------------------------------------------------------------------
+# Builders
+#-----------------------------------------------------------------------------
+class MemoryDoctreesMixin:
+    """
+    Mixin for builders that keep their doctrees in memory.
+
+    Doctrees are pickled into the in-memory cache the environment reads
+    them from (Sphinx 7.2 or newer) rather than to the doctree dir, since
+    renderers never load the environment again.
+    """
+
+    def write_doctree(self, docname, doctree, *args, **kwargs):
+        pickled_doctrees = getattr(self.env, '_pickled_doctree_cache', None)
+        if pickled_doctrees is None:
+            super().write_doctree(docname, doctree, *args, **kwargs)
+            return
+        # Same clean-up as Sphinx does before pickling
+        doctree.reporter = None
+        doctree.transformer = None
+        doctree.settings = doctree.settings.copy()
+        doctree.settings.warning_stream = None
+        doctree.settings.env = None
+        doctree.settings.record_dependencies = None
+        pickled_doctrees[docname] = pickle.dumps(
+            doctree, pickle.HIGHEST_PROTOCOL)
+        if kwargs.get('_cache', True):
+            self.env._write_doc_doctree_cache[docname] = doctree
+
+
+class DocreprHTMLBuilder(MemoryDoctreesMixin, StandaloneHTMLBuilder):
+    """
+    HTML builder that copies its static files only once.
+
+    Docrepr reuses the same Sphinx application for every docstring it
+    renders, so the theme and static files never change between builds.
+
+    If `captured` is a dict, pages are stored there by document name
+    instead of being written to the output dir, and no other output files
+    (search index, images, etc) are generated.
+    """
+
+    def init(self):
+        super().init()
+        self.static_files_copied = False
+        self.captured = None
+
+    def prepare_writing(self, docnames):
+        # Only copy the images of the documents written by this build
+        self.images = {}
+        super().prepare_writing(docnames)
+
+    def copy_static_files(self):
+        if self.static_files_copied:
+            return
+        super().copy_static_files()
+        self.static_files_copied = True
+
+    def handle_page(self, pagename, addctx, templatename='page.html',
+                    *args, **kwargs):
+        if self.captured is None:
+            super().handle_page(
+                pagename, addctx, templatename, *args, **kwargs)
+            return
+        ctx = self.globalcontext.copy()
+        ctx.update(addctx)
+        self.captured[pagename] = self.templates.render(templatename, ctx)
+
+    def finish(self):
+        if self.captured is None:
+            super().finish()
+
+
+class DocreprTextBuilder(MemoryDoctreesMixin, TextBuilder):
+    """
+    Text builder that can keep its output in memory.
+
+    See `DocreprHTMLBuilder` for the meaning of `captured`.
+    """
+
+    def init(self):
+        super().init()
+        self.captured = None
+
+    def write_doc(self, docname, doctree):
+        if self.captured is None:
+            super().write_doc(docname, doctree)
+            return
+        self.current_docname = docname
+        self.secnumbers = self.env.toc_secnumbers.get(docname, {})
+        visitor = self.create_translator(doctree, self)
+        doctree.walkabout(visitor)
+        self.captured[docname] = visitor.body
+
+
+#-----------------------------------------------------------------------------
+# Sphinx extension
+#-----------------------------------------------------------------------------
+def setup(app):
+    """Register the docrepr builders with Sphinx."""
+    app.add_builder(DocreprHTMLBuilder, override=True)
+    app.add_builder(DocreprTextBuilder, override=True)
+    return {'parallel_read_safe': True, 'parallel_write_safe': True}
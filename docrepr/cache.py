@@ -0,0 +1,503 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Caching of rendered docstrings and management of the cache directory.
+
+Rendered output only depends on the docstring text, the object metadata,
+the docrepr options and the docrepr and Sphinx versions, so it's stored
+under a hash of all of them. The cache has an in-memory LRU tier and an
+optional on-disk tier, so repeated lookups across sessions skip Sphinx.
+
+The cache directory holds the pages generated by rich_repr, the working
+directories of the renderers and the on-disk cache tier. It's pruned from
+time to time to keep it under a maximum size and age.
+"""
+
+# Stdlib imports
+import hashlib
+import json
+import os
+import os.path as osp
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Local imports
+from . import __version__, options
+from .stats import count
+from .utils import link_tree
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+# Options that control how docstrings are rendered and cached, rather than
+# the rendered output
+RUNTIME_OPTIONS = {
+    'cache_size', 'disk_cache', 'cache_max_size', 'cache_max_age',
+    'doctree_cache_size', 'render_processes', 'max_renders_per_process',
+    'template_bytecode_cache', 'concurrent_class_docstring', 'render_server'}
+
+# Name of the on-disk render cache tier inside the cache directory
+RENDER_CACHE_DIRNAME = 'render-cache'
+
+# Name of the cache of plot images inside the cache directory
+PLOT_CACHE_DIRNAME = 'plot-cache'
+
+# Name of the Jinja bytecode cache inside the cache directory
+TEMPLATE_CACHE_DIRNAME = 'template-cache'
+
+# Prefix of the working directories of the renderers
+RENDERER_PREFIX = 'renderer-'
+
+# Prefix of the static dirs shared by all rendered pages
+STATIC_PREFIX = 'static-'
+
+# Prefix of the conf dirs generated for renders with temp_confdir
+CONFDIR_PREFIX = 'conf-'
+
+# File where a running render server advertises itself to other processes
+SERVER_FILENAME = '.server.json'
+
+# File listing the entries that are never evicted, e.g. prerendered pages
+PINNED_FILENAME = '.pinned'
+
+# Files and directories used to coordinate pruning between processes
+PRUNE_STAMP = '.pruned'
+PRUNE_LOCK = '.prune.lock'
+TRASH_PREFIX = '.trash-'
+
+# Minimum time between two automatic prunes of the cache directory
+PRUNE_INTERVAL = 60
+
+# Entries used more recently than this are never evicted, since they may
+# still be displayed
+GRACE_PERIOD = 60
+
+# Locks older than this were left by a crashed process
+LOCK_TIMEOUT = 300
+
+
+#-----------------------------------------------------------------------------
+# Utility functions
+#-----------------------------------------------------------------------------
+def cache_key(*parts):
+    """
+    Compute the cache key of a render from all the inputs it depends on.
+
+    Parameters
+    ----------
+    *parts
+        JSON-serializable inputs of the render (docstring, metadata, etc).
+        The rendering options and the docrepr and Sphinx versions are
+        always included.
+
+    Returns
+    -------
+    A hex digest identifying the render.
+    """
+    import sphinx
+
+    render_options = {
+        name: value for name, value in options.items()
+        if name not in RUNTIME_OPTIONS
+        }
+    data = json.dumps(
+        [__version__, sphinx.__version__, render_options, parts],
+        sort_keys=True,
+        default=repr,
+        )
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+#-----------------------------------------------------------------------------
+# Cache
+#-----------------------------------------------------------------------------
+class RenderCache:
+    """
+    Two-tier cache mapping render keys to rendered text.
+
+    The in-memory tier keeps the `cache_size` most recently used entries
+    (see `docrepr.options`). If a directory is passed to `get` and `put`,
+    entries are also looked up and stored there, one file per key.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def entry_path(key, directory):
+        """Return the path of the file of an entry stored in `directory`."""
+        return osp.join(directory, key[:2], key)
+
+    def get(self, key, directory=None):
+        """Return the value stored under `key`, or None if there is none."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        if directory is None:
+            return None
+        path = self.entry_path(key, directory)
+        try:
+            with open(path, encoding='utf-8') as fid:
+                value = fid.read()
+        except OSError:
+            return None
+        touch(path)
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value, directory=None):
+        """Store `value` under `key`."""
+        self._remember(key, value)
+        if directory is None:
+            return
+
+        path = self.entry_path(key, directory)
+        try:
+            os.makedirs(osp.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=osp.dirname(path))
+        except OSError:
+            return
+        # Write to a temp file first so that concurrent readers never see a
+        # partially written entry
+        try:
+            with open(fd, 'w', encoding='utf-8') as fid:
+                fid.write(value)
+            os.replace(temp_path, path)
+            count('bytes_written', osp.getsize(path))
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def discard(self, key, directory=None):
+        """Remove the entry stored under `key`, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if directory is not None:
+            try:
+                os.remove(self.entry_path(key, directory))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Empty the in-memory tier."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, value):
+        maxsize = options.get('cache_size', 0)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+
+# Cache shared by all sphinxify and rich_repr calls in this process
+render_cache = RenderCache()
+
+
+#-----------------------------------------------------------------------------
+# Cache directory
+#-----------------------------------------------------------------------------
+def touch(path):
+    """Mark a cache directory entry as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def make_render_dir(cachedir):
+    """
+    Create a new directory for a rendered page in `cachedir`.
+
+    The cache directory is pruned first if it hasn't been for a while.
+    """
+    os.makedirs(cachedir, exist_ok=True)
+    maybe_prune_cachedir(cachedir)
+    return tempfile.mkdtemp(dir=cachedir)
+
+
+def publish_dir(path, fill):
+    """
+    Create the dir `path`, with its contents written by ``fill(temp_dir)``.
+
+    The dir is filled under a hidden name first and then renamed to `path`,
+    so it's never seen incomplete. If another process publishes `path` in
+    the meantime, its dir is kept and ours is discarded.
+    """
+    parent = osp.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix='.' + osp.basename(path), dir=parent)
+    try:
+        fill(temp_dir)
+        os.rename(temp_dir, path)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if not osp.isdir(path):
+            raise
+
+
+def shared_static_dir(static_dir, cachedir):
+    """
+    Return a dir in `cachedir` with the same contents as `static_dir`.
+
+    The dir is named after a hash of its contents, so all the pages whose
+    builds have the same static files can share it instead of each having
+    its own copy.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = osp.join(root, name)
+            digest.update(osp.relpath(path, static_dir).encode('utf-8'))
+            with open(path, 'rb') as fid:
+                digest.update(hashlib.sha256(fid.read()).digest())
+
+    shared_dir = osp.join(cachedir, STATIC_PREFIX + digest.hexdigest()[:16])
+    if not osp.isdir(shared_dir):
+        publish_dir(shared_dir,
+                    lambda temp_dir: link_tree(static_dir, temp_dir))
+    return shared_dir
+
+
+def pinned_entries(cachedir):
+    """Return the set of paths of the pinned entries of `cachedir`."""
+    try:
+        with open(osp.join(cachedir, PINNED_FILENAME),
+                  encoding='utf-8') as pinned_file:
+            names = pinned_file.read().splitlines()
+    except OSError:
+        return set()
+    return {osp.join(cachedir, name) for name in names if name}
+
+
+def pin_entries(cachedir, paths):
+    """
+    Exempt entries of `cachedir` from pruning.
+
+    Parameters
+    ----------
+    cachedir : str
+        The cache directory.
+
+    paths : iterable of str
+        Paths of the entries to pin: files of the on-disk render cache tier
+        or top-level entries of `cachedir`, such as page directories.
+    """
+    pinned = pinned_entries(cachedir)
+    pinned.update(osp.join(cachedir, osp.relpath(path, cachedir))
+                  for path in paths)
+    names = sorted(osp.relpath(path, cachedir) for path in pinned)
+    # Write to a temp file first, so that pruning never sees it incomplete
+    fd, temp_path = tempfile.mkstemp(prefix=PINNED_FILENAME, dir=cachedir)
+    try:
+        with open(fd, 'w', encoding='utf-8') as pinned_file:
+            pinned_file.write(''.join(name + '\n' for name in names))
+        os.replace(temp_path, osp.join(cachedir, PINNED_FILENAME))
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def maybe_prune_cachedir(cachedir):
+    """Prune `cachedir` unless it was pruned in the last `PRUNE_INTERVAL`."""
+    try:
+        last_pruned = os.stat(osp.join(cachedir, PRUNE_STAMP)).st_mtime
+    except OSError:
+        last_pruned = 0
+    if time.time() - last_pruned >= PRUNE_INTERVAL:
+        prune_cachedir(cachedir)
+
+
+def _disk_usage(path):
+    """Return the total size of the files in `path`."""
+    if not osp.isdir(path):
+        try:
+            return os.lstat(path).st_size
+        except OSError:
+            return 0
+    size = 0
+    for root, __, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(osp.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _cachedir_entries(cachedir):
+    """
+    List the evictable entries of `cachedir`.
+
+    Returns a list of ``(last_used, size, path, evict_for_size)`` tuples.
+    Renderer working directories, shared static dirs and generated conf
+    dirs are only evicted once they are too old, since they may still be in
+    use. Pinned entries (see `pin_entries`) are never evicted.
+    """
+    pinned = pinned_entries(cachedir)
+    entries = []
+    paths = []
+    for name in os.listdir(cachedir):
+        if name.startswith('.'):
+            continue
+        path = osp.join(cachedir, name)
+        if name in (RENDER_CACHE_DIRNAME, PLOT_CACHE_DIRNAME):
+            for bucket in os.listdir(path):
+                bucket_dir = osp.join(path, bucket)
+                if osp.isdir(bucket_dir):
+                    paths.extend(
+                        osp.join(bucket_dir, key)
+                        for key in os.listdir(bucket_dir))
+        else:
+            paths.append(path)
+
+    for path in paths:
+        if path in pinned:
+            continue
+        try:
+            last_used = os.stat(path).st_mtime
+        except OSError:
+            continue
+        evict_for_size = not osp.basename(path).startswith(
+            (RENDERER_PREFIX, STATIC_PREFIX, CONFDIR_PREFIX))
+        entries.append((last_used, _disk_usage(path), path, evict_for_size))
+    return entries
+
+
+def _remove(path, cachedir):
+    """
+    Remove a cache directory entry.
+
+    Entries are moved out of the way first, so other processes never see
+    them half-deleted.
+    """
+    trash = osp.join(cachedir, TRASH_PREFIX + uuid.uuid4().hex)
+    try:
+        os.rename(path, trash)
+    except OSError:
+        # Already removed by another process
+        return
+    if osp.isdir(trash):
+        shutil.rmtree(trash, ignore_errors=True)
+    else:
+        try:
+            os.remove(trash)
+        except OSError:
+            pass
+
+
+def _acquire_prune_lock(cachedir):
+    lock = osp.join(cachedir, PRUNE_LOCK)
+    for __ in range(2):
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock).st_mtime < LOCK_TIMEOUT:
+                    return False
+                os.remove(lock)
+            except OSError:
+                pass
+        except OSError:
+            return False
+    return False
+
+
+def prune_cachedir(cachedir, max_size=None, max_age=None):
+    """
+    Evict the least recently used entries of `cachedir`.
+
+    Only one process prunes a cache directory at a time; if another one
+    already is, this returns immediately.
+
+    Parameters
+    ----------
+    cachedir : str
+        The cache directory.
+
+    max_size : int, optional
+        Maximum total size in bytes. Defaults to the `cache_max_size`
+        option; None means unlimited.
+
+    max_age : float, optional
+        Maximum time in seconds since an entry was last used. Defaults to
+        the `cache_max_age` option; None means unlimited.
+
+    Returns
+    -------
+    The number of bytes freed.
+    """
+    if max_size is None:
+        max_size = options.get('cache_max_size')
+    if max_age is None:
+        max_age = options.get('cache_max_age')
+    if not osp.isdir(cachedir) or not _acquire_prune_lock(cachedir):
+        return 0
+
+    freed = 0
+    try:
+        # Leftovers of interrupted removals
+        for name in os.listdir(cachedir):
+            if name.startswith(TRASH_PREFIX):
+                _remove(osp.join(cachedir, name), cachedir)
+
+        now = time.time()
+        entries = sorted(_cachedir_entries(cachedir))
+        # Renderer working directories don't count towards the size limit,
+        # since they can't be evicted to satisfy it
+        total = sum(
+            size for __, size, __, evict_for_size in entries
+            if evict_for_size)
+        for last_used, size, path, evict_for_size in entries:
+            if now - last_used < GRACE_PERIOD:
+                continue
+            too_old = max_age is not None and now - last_used > max_age
+            too_big = (max_size is not None and total > max_size
+                       and evict_for_size)
+            if too_old or too_big:
+                _remove(path, cachedir)
+                freed += size
+                if evict_for_size:
+                    total -= size
+
+        with open(osp.join(cachedir, PRUNE_STAMP), 'w'):
+            pass
+    finally:
+        try:
+            os.remove(osp.join(cachedir, PRUNE_LOCK))
+        except OSError:
+            pass
+    return freed
+
+
+def purge_cachedir(cachedir):
+    """
+    Remove every entry of `cachedir`.
+
+    The working directories of running renderers are removed as well, so
+    they should be reset before calling this.
+    """
+    if not osp.isdir(cachedir):
+        return
+    for name in os.listdir(cachedir):
+        if name in (PRUNE_LOCK, PRUNE_STAMP, SERVER_FILENAME):
+            continue
+        _remove(osp.join(cachedir, name), cachedir)
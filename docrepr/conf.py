@@ -103,7 +103,7 @@
 plot_html_show_source_link = False
 plot_html_show_formats = False
 plot_formats = [('png', 100)]
-plot_working_directory = '/tmp'
+# plot_working_directory is set to a dir of each renderer
 
 import math
 phi = (math.sqrt(5) + 1)/2
@@ -0,0 +1,164 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Render simple docstrings with docutils alone.
+
+Most docstrings only contain paragraphs, lists and sections, which plain
+docutils renders exactly as Sphinx does once a few of its HTML quirks are
+mimicked. Rendering them without a Sphinx build is much faster. Anything
+else (directives, roles, code, tables, etc) is left to Sphinx.
+"""
+
+# Stdlib imports
+import io
+import re
+
+# 3rd party imports
+from docutils import nodes
+from docutils.core import publish_parts
+from docutils.writers import html5_polyglot
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+# Quick check for markup that surely needs Sphinx, to avoid parsing those
+# docstrings twice. It's written so searches take linear time.
+SPHINX_MARKUP_RE = re.compile(
+    r'^[^\S\n]*\.\. [\w:-]+::'  # Directives
+    r'|(?<![\w:]):[\w:+-]+:`'  # Roles
+    r'|^[^\S\n]*>>>'  # Doctests, which Sphinx highlights
+    r'|::[^\S\n]*$',  # Literal blocks, which Sphinx highlights too
+    re.MULTILINE,
+    )
+
+# Nodes rendered the same way by docutils and Sphinx. Any other node in the
+# doctree (including system messages) means the docstring needs Sphinx.
+ALLOWED_NODES = (
+    nodes.Text, nodes.document, nodes.section, nodes.title, nodes.paragraph,
+    nodes.emphasis, nodes.strong, nodes.literal, nodes.bullet_list,
+    nodes.enumerated_list, nodes.list_item, nodes.definition_list,
+    nodes.definition_list_item, nodes.term, nodes.classifier,
+    nodes.definition, nodes.block_quote, nodes.reference, nodes.target,
+    )
+
+# Sphinx's defaults for the docutils settings that affect the output
+SETTINGS = {
+    'doctitle_xform': False,
+    'sectsubtitle_xform': False,
+    'section_self_link': False,
+    'initial_header_level': 1,
+    'auto_id_prefix': 'id',
+    'smart_quotes': True,
+    'compact_lists': True,
+    'cloak_email_addresses': True,
+    'file_insertion_enabled': False,
+    'raw_enabled': False,
+    'report_level': 2,
+    'halt_level': 5,
+    'embed_stylesheet': False,
+    'stylesheet_path': '',
+    }
+
+PERMALINK_TITLE = 'Link to this heading'
+PERMALINK_ICON = '¶'
+
+
+#-----------------------------------------------------------------------------
+# HTML writer
+#-----------------------------------------------------------------------------
+class HTMLTranslator(html5_polyglot.HTMLTranslator):
+    """docutils HTML translator producing the same markup as Sphinx's."""
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.protect_literal_text = 0
+
+    def visit_Text(self, node):
+        if not self.protect_literal_text:
+            super().visit_Text(node)
+            return
+        encoded = self.encode(node.astext())
+        for token in self.words_and_spaces.findall(encoded):
+            if token.strip():
+                # Protect literal text from line wrapping
+                self.body.append('<span class="pre">%s</span>' % token)
+            elif token in {' ', '\n'}:
+                self.body.append(token)
+            else:
+                # Protect runs of multiple spaces; the last one can wrap
+                self.body.append('&#160;' * (len(token) - 1) + ' ')
+
+    def visit_literal(self, node):
+        self.body.append(self.starttag(
+            node, 'code', '', CLASS='docutils literal notranslate'))
+        self.protect_literal_text += 1
+
+    def depart_literal(self, node):
+        self.protect_literal_text -= 1
+        self.body.append('</code>')
+
+    def visit_block_quote(self, node):
+        self.body.append(self.starttag(node, 'blockquote') + '<div>')
+
+    def depart_block_quote(self, node):
+        self.body.append('</div></blockquote>\n')
+
+    def depart_title(self, node):
+        if (isinstance(node.parent, nodes.section) and node.parent['ids']
+                and self.context[-1].startswith('</h')):
+            self.body.append(
+                '<a class="headerlink" href="#%s" title="%s">%s</a>'
+                % (node.parent['ids'][0], PERMALINK_TITLE, PERMALINK_ICON))
+        super().depart_title(node)
+
+
+class HTMLWriter(html5_polyglot.Writer):
+    """docutils HTML writer using `HTMLTranslator`."""
+
+    def __init__(self):
+        super().__init__()
+        self.translator_class = HTMLTranslator
+
+
+#-----------------------------------------------------------------------------
+# Rendering
+#-----------------------------------------------------------------------------
+def _is_allowed(node):
+    if not isinstance(node, ALLOWED_NODES):
+        return False
+    if isinstance(node, (nodes.reference, nodes.target)):
+        # Only external links are resolved the same way
+        return 'refuri' in node
+    return True
+
+
+def render_html(docstring):
+    """
+    Render `docstring` to HTML with docutils, if it doesn't need Sphinx.
+
+    Parameters
+    ----------
+    docstring : str
+        A reST-formatted docstring
+
+    Returns
+    -------
+    The HTML body of the docstring, as Sphinx would produce it, or None if
+    the docstring uses any markup that requires Sphinx.
+    """
+    if SPHINX_MARKUP_RE.search(docstring):
+        return None
+
+    writer = HTMLWriter()
+    settings = dict(SETTINGS, warning_stream=io.StringIO())
+    parts = publish_parts(
+        docstring, writer=writer, settings_overrides=settings)
+
+    doctree = writer.document
+    findall = getattr(doctree, 'findall', None) or doctree.traverse
+    if not all(_is_allowed(node) for node in findall()):
+        return None
+    return parts['body']
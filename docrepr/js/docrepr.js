@@ -0,0 +1,257 @@
+//----------------------------------------------------------------------------
+//  Behavior of rich_repr pages, without jQuery or Bootstrap.
+//
+//  Vanilla JS versions of utils.js, copy_button.js, collapse_sections.js,
+//  move_outline.js and of the Bootstrap tabs. Collapsing sections and
+//  moving the outline are enabled with the data-collapse-sections and
+//  data-outline attributes of the body.
+//
+//  Copyright (c) 2011, 2012 Python Software Foundation
+//  Copyright (c) 2011-2012 Assurance Technologies, LLC
+//  Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+//
+//  The copy button is adapted from https://docs.python.org/_static/copybutton.js
+//  and released under the PSF License: https://docs.python.org/3/license.html
+//  Toggleable sections are adapted from the Cloud Sphinx theme.
+//
+//  Distributed under the terms of the BSD 3-Clause License.
+//----------------------------------------------------------------------------
+
+(function () {
+    "use strict";
+
+    function each(elements, callback) {
+        Array.prototype.forEach.call(elements, callback);
+    }
+
+    function matches(element, selector) {
+        var match = element.matches || element.msMatchesSelector ||
+                    element.webkitMatchesSelector;
+        return match.call(element, selector);
+    }
+
+    function setDisplayed(element, displayed) {
+        element.style.display = displayed ? "" : "none";
+    }
+
+    //========================================================================
+    // Page cleanup (utils.js)
+    //========================================================================
+
+    function cleanUp() {
+        var docstring = document.querySelector("div.docstring");
+
+        // Remove anchor header links.
+        // They're used by Sphinx to create crossrefs, so we don't need them
+        each(document.querySelectorAll("a.headerlink"), function (link) {
+            link.parentNode.removeChild(link);
+        });
+        if (!docstring) {
+            return;
+        }
+
+        // If the first child in the docstring div is a section, change its
+        // class to title. This means that the docstring has a real title and
+        // we need to use it.
+        var first = docstring.firstElementChild;
+        if (first && matches(first, "div.section") &&
+                !document.querySelector("div.title")) {
+            first.classList.remove("section");
+            first.classList.add("title");
+        }
+
+        // Change docstring headers from h1 to h2
+        // It can only be an h1 and that's the page title
+        each(docstring.querySelectorAll("div.section h1"), function (h1) {
+            var h2 = document.createElement("h2");
+            h2.textContent = h1.textContent;
+            h1.parentNode.replaceChild(h2, h1);
+        });
+    }
+
+    //========================================================================
+    // Copy button (copy_button.js)
+    //========================================================================
+
+    function addCopyButtons() {
+        var hideText = "Hide the prompts and output";
+        var showText = "Show the prompts and output";
+
+        function setHidden(block, hidden) {
+            each(block.querySelectorAll(".go, .gp, .gt"), function (prompt) {
+                setDisplayed(prompt, !hidden);
+            });
+            // Traceback lines, from each .gt to the next prompt or output
+            each(block.querySelectorAll("pre .gt"), function (traceback) {
+                var next = traceback.nextElementSibling;
+                while (next && !matches(next, ".gp, .go")) {
+                    next.style.visibility = hidden ? "hidden" : "visible";
+                    next = next.nextElementSibling;
+                }
+            });
+        }
+
+        var blocks = document.querySelectorAll(
+            ".highlight-python .highlight, .highlight-python3 .highlight");
+        each(blocks, function (block) {
+            var pre = block.querySelector("pre");
+            if (!pre) {
+                return;
+            }
+            block.parentNode.style.position = "relative";
+
+            // Tracebacks (.gt) contain bare text that needs to be wrapped
+            // in a span to be hidden along with the rest
+            each(block.querySelectorAll("pre"), function (code) {
+                if (!code.querySelector(".gt")) {
+                    return;
+                }
+                each(Array.prototype.slice.call(code.childNodes),
+                     function (node) {
+                    if (node.nodeType === 3 && node.data.trim().length > 0) {
+                        var span = document.createElement("span");
+                        code.replaceChild(span, node);
+                        span.appendChild(node);
+                    }
+                });
+            });
+
+            if (!block.querySelector(".gp")) {
+                return;
+            }
+
+            // Create and add the button to the code blocks that contain >>>
+            var style = window.getComputedStyle(pre);
+            var button = document.createElement("span");
+            button.className = "copybutton";
+            button.innerHTML = "&gt;&gt;&gt;";
+            button.title = hideText;
+            button.style.cssText = [
+                "cursor: pointer", "position: absolute", "top: 0",
+                "right: 0", "font-family: monospace",
+                "padding-left: 0.2em", "padding-right: 0.2em",
+                "margin-right: 10px", "border-top-right-radius: 4px",
+                "border-color: " + style.borderTopColor,
+                "border-style: " + style.borderTopStyle,
+                "border-width: " + style.borderTopWidth,
+                "color: " + style.borderTopColor
+            ].join("; ");
+            block.insertBefore(button, block.firstChild);
+
+            var hidden = false;
+            button.addEventListener("click", function () {
+                hidden = !hidden;
+                setHidden(block, hidden);
+                button.style.textDecoration = hidden ? "line-through" : "none";
+                button.title = hidden ? showText : hideText;
+            });
+        });
+    }
+
+    //========================================================================
+    // Toggleable sections (collapse_sections.js)
+    //========================================================================
+
+    function collapseSections() {
+        var headers = document.querySelectorAll(
+            ".section > h2, .section > h3, .section > h4");
+        each(headers, function (header) {
+            var section = header.parentNode;
+            header.classList.add("html-toggle-button");
+
+            // Helper to test if the url hash is within this section
+            function containsHash() {
+                var hash = document.location.hash;
+                var target = hash && document.getElementById(hash.substr(1));
+                return Boolean(target && section.contains(target));
+            }
+
+            // Helper to control the toggle state
+            function setState(expanded) {
+                section.classList.toggle("expanded", expanded);
+                section.classList.toggle("collapsed", !expanded);
+                each(section.children, function (child) {
+                    setDisplayed(child, expanded || child === header ||
+                                 matches(child, "span:first-child:empty"));
+                });
+            }
+
+            // Initialize state
+            setState(section.classList.contains("expanded") ||
+                     containsHash());
+
+            // Bind toggle callback
+            header.addEventListener("click", function () {
+                setState(!section.classList.contains("expanded"));
+            });
+
+            // Open section if the user jumps to it from within the page
+            window.addEventListener("hashchange", function () {
+                if (containsHash()) {
+                    setState(true);
+                    document.getElementById(
+                        document.location.hash.substr(1)).scrollIntoView();
+                }
+            });
+        });
+    }
+
+    //========================================================================
+    // Outline (move_outline.js)
+    //========================================================================
+
+    function moveOutline() {
+        var outline = document.getElementById("outline");
+        var first = document.querySelector(".section");
+        if (outline && first && first !== outline) {
+            first.parentNode.insertBefore(outline, first);
+        }
+    }
+
+    //========================================================================
+    // Tabs
+    //========================================================================
+
+    function initTabs() {
+        var links = document.querySelectorAll('[data-toggle="tab"]');
+        each(links, function (link) {
+            link.addEventListener("click", function (event) {
+                event.preventDefault();
+                var item = link.parentNode;
+                var pane = document.getElementById(
+                    link.getAttribute("href").substr(1));
+                each(item.parentNode.children, function (sibling) {
+                    sibling.classList.remove("active");
+                });
+                each(pane.parentNode.children, function (sibling) {
+                    sibling.classList.remove("active");
+                });
+                item.classList.add("active");
+                pane.classList.add("active");
+            });
+        });
+    }
+
+    //========================================================================
+    // On document ready
+    //========================================================================
+
+    function init() {
+        var body = document.body;
+        cleanUp();
+        addCopyButtons();
+        if (body.hasAttribute("data-collapse-sections")) {
+            collapseSections();
+        }
+        if (body.hasAttribute("data-outline")) {
+            moveOutline();
+        }
+        initTabs();
+    }
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", init);
+    } else {
+        init();
+    }
+}());
@@ -0,0 +1,98 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Sphinx extension that renders math as MathML at build time.
+
+Browsers display MathML by themselves, so pages don't need to load MathJax
+and typeset their math after being shown. LaTeX is converted with the
+pure-Python converter of docutils; expressions it doesn't support are shown
+as LaTeX source instead.
+"""
+
+# Stdlib imports
+import functools
+
+# 3rd party imports
+from docutils import nodes
+from docutils.utils.math import unichar2tex
+from sphinx.util.math import get_node_equation_number
+
+try:
+    from docutils.utils.math.latex2mathml import tex2mathml
+except ImportError:
+    # docutils < 0.18
+    from docutils.utils.math.latex2mathml import parse_latex_math
+
+    def tex2mathml(tex_math, as_block=False):
+        return ''.join(parse_latex_math(tex_math, inline=not as_block).xml())
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+# Number of converted expressions kept in memory
+MATHML_CACHE_SIZE = 1024
+
+
+#-----------------------------------------------------------------------------
+# Conversion
+#-----------------------------------------------------------------------------
+@functools.lru_cache(maxsize=MATHML_CACHE_SIZE)
+def latex_to_mathml(latex, block=False):
+    """
+    Convert a LaTeX math expression to MathML.
+
+    Returns None if the expression can't be converted, e.g. because it uses
+    commands or environments that are not supported. Conversions are
+    cached, since the same expressions tend to appear in many docstrings.
+    """
+    try:
+        return tex2mathml(
+            latex.translate(unichar2tex.uni2tex_table), as_block=block)
+    except Exception:
+        # The converter also fails with other errors on some input, e.g.
+        # alignment marks outside of an environment
+        return None
+
+
+def math_markup(translator, latex, block=False):
+    """Markup of an expression: MathML if possible, else escaped LaTeX."""
+    mathml = latex_to_mathml(latex, block)
+    if mathml is None:
+        return translator.encode(latex)
+    return mathml
+
+
+#-----------------------------------------------------------------------------
+# HTML translator visitors
+#-----------------------------------------------------------------------------
+def html_visit_math(self, node):
+    self.body.append(self.starttag(node, 'span', '', CLASS='math'))
+    self.body.append(math_markup(self, node.astext()))
+    self.body.append('</span>')
+    raise nodes.SkipNode
+
+
+def html_visit_displaymath(self, node):
+    self.body.append(self.starttag(node, 'div', CLASS='math'))
+    if node['number']:
+        number = get_node_equation_number(self, node)
+        self.body.append('<span class="eqno">(%s)</span>' % number)
+    # Equations separated by blank lines are shown one below the other
+    for part in node.astext().split('\n\n'):
+        if part.strip():
+            self.body.append(math_markup(self, part, block=True))
+    self.body.append('</div>\n')
+    raise nodes.SkipNode
+
+
+def setup(app):
+    """Register MathML as a math renderer of the HTML builders."""
+    app.add_html_math_renderer(
+        'mathml',
+        (html_visit_math, None),
+        (html_visit_displaymath, None),
+        )
+    return {'parallel_read_safe': True, 'parallel_write_safe': True}
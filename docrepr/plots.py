@@ -0,0 +1,175 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Sphinx extension that caches the images of Matplotlib plot directives.
+
+The plot directive runs the code of each plot and saves its figures every
+time a docstring is read, which takes much longer than the rest of the
+build. With this extension, the images are stored in a cache directory
+under a hash of the plot code and the configuration it's run with, and
+reused by any later build that contains the same plot, in this or other
+processes.
+"""
+
+# Stdlib imports
+import functools
+import hashlib
+import json
+import os
+import os.path as osp
+import shutil
+import tempfile
+
+# 3rd party imports
+import matplotlib
+from matplotlib.sphinxext import plot_directive
+
+# Local imports
+from .cache import touch
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+# Name of the file describing the images of a cache entry
+MANIFEST_NAME = 'manifest.json'
+
+# Configuration values that change the images of a plot
+CONFIG_VALUES = [
+    'plot_pre_code', 'plot_rcparams', 'plot_apply_rcparams', 'plot_formats',
+    'plot_srcset',
+    ]
+
+
+#-----------------------------------------------------------------------------
+# Plot cache
+#-----------------------------------------------------------------------------
+def plot_key(code, function_name, config):
+    """Compute the cache key of the images of a plot."""
+    data = json.dumps(
+        [matplotlib.__version__, code, function_name,
+         {name: getattr(config, name, None) for name in CONFIG_VALUES}],
+        sort_keys=True,
+        default=repr,
+        )
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def restore_images(entry_dir, output_dir, output_base):
+    """
+    Copy the images of a cache entry to `output_dir`.
+
+    Returns the results of `render_figures` for them, or None if the entry
+    doesn't exist.
+    """
+    try:
+        with open(osp.join(entry_dir, MANIFEST_NAME),
+                  encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+    results = []
+    try:
+        for code_piece, images in manifest:
+            image_files = []
+            for suffix, formats in images:
+                image_file = plot_directive.ImageFile(
+                    output_base + suffix, output_dir)
+                for fmt in formats:
+                    # Copies, since the plot directive may overwrite them
+                    shutil.copyfile(
+                        osp.join(entry_dir, 'image%s.%s' % (suffix, fmt)),
+                        image_file.filename(fmt))
+                image_file.formats = list(formats)
+                image_files.append(image_file)
+            results.append((code_piece, image_files))
+    except OSError:
+        # Evicted while being read
+        return None
+    touch(entry_dir)
+    return results
+
+
+def store_images(entry_dir, results, output_base):
+    """Store the images of the results of `render_figures` in the cache."""
+    manifest = []
+    for code_piece, images in results:
+        entries = []
+        for image_file in images:
+            if not image_file.basename.startswith(output_base):
+                return
+            entries.append((image_file.basename[len(output_base):],
+                            image_file.formats))
+        manifest.append((code_piece, entries))
+
+    # Fill in a temp dir first, so that other processes never see a
+    # partially written entry
+    parent_dir = osp.dirname(entry_dir)
+    try:
+        os.makedirs(parent_dir, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix='.', dir=parent_dir)
+    except OSError:
+        return
+    try:
+        for (__, images), (__, entries) in zip(results, manifest):
+            for image_file, (suffix, formats) in zip(images, entries):
+                for fmt in formats:
+                    shutil.copyfile(
+                        image_file.filename(fmt),
+                        osp.join(temp_dir, 'image%s.%s' % (suffix, fmt)))
+        with open(osp.join(temp_dir, MANIFEST_NAME), 'w',
+                  encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.rename(temp_dir, entry_dir)
+    except OSError:
+        # Already stored by another process
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def cached_render_figures(render_figures):
+    """
+    Wrap the `render_figures` function of the plot directive with the cache.
+
+    The wrapper replaces the function for the whole process, so the cache
+    is only used by the apps that loaded this extension, which define its
+    directory. Plots that share their context with others are always run,
+    since their figures also depend on the plots that ran before.
+    """
+    @functools.wraps(render_figures)
+    def wrapper(code, code_path, output_dir, output_base, context,
+                function_name, config, *args, **kwargs):
+        cache_dir = getattr(config, 'docrepr_plot_cache_dir', None)
+        if context or not cache_dir:
+            return render_figures(
+                code, code_path, output_dir, output_base, context,
+                function_name, config, *args, **kwargs)
+
+        key = plot_key(code, function_name, config)
+        entry_dir = osp.join(cache_dir, key[:2], key)
+        results = restore_images(entry_dir, output_dir, output_base)
+        if results is None:
+            results = render_figures(
+                code, code_path, output_dir, output_base, context,
+                function_name, config, *args, **kwargs)
+            store_images(entry_dir, results, output_base)
+        return results
+
+    wrapper.docrepr_cached = True
+    return wrapper
+
+
+#-----------------------------------------------------------------------------
+# Sphinx extension
+#-----------------------------------------------------------------------------
+def setup(app):
+    """Set up the plot directive, with its images cached."""
+    app.setup_extension('matplotlib.sphinxext.plot_directive')
+    app.add_config_value('docrepr_plot_cache_dir', None, 'env')
+    # The plot directive looks up the function when it runs
+    if not getattr(plot_directive.render_figures, 'docrepr_cached', False):
+        plot_directive.render_figures = cached_render_figures(
+            plot_directive.render_figures)
+    return {'parallel_read_safe': True, 'parallel_write_safe': True}
@@ -0,0 +1,218 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Rendering of whole packages ahead of time.
+
+``python -m docrepr prerender numpy scipy`` renders the pages of the public
+objects of each package into the on-disk render cache, so that looking them
+up later is a cache hit. Objects already in the cache are skipped, so an
+interrupted run resumes where it stopped.
+
+Pages are looked up by the object info dict of the object, including its
+name, so they're only found when it's inspected under the same name (e.g.
+``numpy.linalg.norm``) and with the same rendering options. The
+``disk_cache`` option must be set to look them up. Prerendered pages are
+pinned in the cache directory, so they're never pruned, however old they
+get.
+"""
+
+# Stdlib imports
+import importlib
+import inspect
+import os
+import os.path as osp
+import types
+from collections import deque
+
+# Local imports
+from . import sphinxify
+from .cache import pin_entries, render_cache
+from .sphinxify import (RENDER_CHUNKSIZE, RenderPool, lookup_rich_reprs,
+                        render_cache_dir, rich_repr_cache_key)
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+# Names of the submodules of packages that are never rendered
+SKIPPED_MODULES = {'conftest', 'setup', 'testing', 'tests'}
+
+
+#-----------------------------------------------------------------------------
+# Utility functions
+#-----------------------------------------------------------------------------
+def _public_names(obj):
+    names = getattr(obj, '__all__', None)
+    if names is None or not isinstance(obj, types.ModuleType):
+        names = [name for name in dir(obj) if not name.startswith('_')]
+    return names
+
+
+def public_objects(package):
+    """
+    List the public objects of a package.
+
+    These are the package itself, its public attributes and the public
+    methods of its classes, recursively through the submodules it imports.
+    Objects reachable under several names are only listed under the one
+    closest to the top of the package.
+
+    Parameters
+    ----------
+    package : str
+        Name of the package (or module).
+
+    Returns
+    -------
+    A list of ``(name, object)`` tuples.
+    """
+    module = importlib.import_module(package)
+    objects = []
+    seen = set()
+    pending = deque([(package, module)])
+    while pending:
+        name, obj = pending.popleft()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        objects.append((name, obj))
+
+        is_module = isinstance(obj, types.ModuleType)
+        if not (is_module or inspect.isclass(obj)):
+            continue
+        for attribute in _public_names(obj):
+            try:
+                value = getattr(obj, attribute)
+            except Exception:
+                continue
+            if isinstance(value, types.ModuleType):
+                # Only walk the submodules of the package itself
+                if (not is_module
+                        or not value.__name__.startswith(package + '.')
+                        or attribute in SKIPPED_MODULES):
+                    continue
+            elif not is_module and not inspect.isroutine(value):
+                # Only render the methods of classes
+                continue
+            pending.append((name + '.' + attribute, value))
+    return objects
+
+
+def build_oinfos(objects):
+    """
+    Build the object info dicts of objects, as IPython would.
+
+    Objects that IPython can't inspect are left out.
+
+    Parameters
+    ----------
+    objects : list of tuple
+        ``(name, object)`` tuples, as returned by `public_objects`.
+
+    Returns
+    -------
+    A dict with the object info dict of each object, by name.
+    """
+    from IPython.core.oinspect import Inspector
+
+    inspector = Inspector()
+    oinfos = {}
+    for name, obj in objects:
+        try:
+            oinfo = inspector.info(obj, oname=name)
+        except Exception:
+            continue
+        oinfo['name'] = name
+        oinfos[name] = oinfo
+    return oinfos
+
+
+def pin_pages(oinfos):
+    """
+    Pin the cached pages of objects in the cache directory.
+
+    This keeps their on-disk render cache files, page directories and
+    shared static dirs from being pruned (see `docrepr.cache.pin_entries`).
+    """
+    cache_dir = render_cache_dir()
+    if cache_dir is None:
+        return
+    paths = set()
+    for oinfo in oinfos.values():
+        key = rich_repr_cache_key('rich_repr', oinfo)
+        output_file_path = render_cache.get(key, cache_dir)
+        if output_file_path is None or not osp.isfile(output_file_path):
+            continue
+        page_dir = osp.dirname(output_file_path)
+        paths.update([render_cache.entry_path(key, cache_dir), page_dir])
+        static_dir = osp.join(page_dir, '_static')
+        if osp.islink(static_dir):
+            paths.add(os.readlink(static_dir))
+    if paths:
+        pin_entries(sphinxify.CACHEDIR, paths)
+
+
+#-----------------------------------------------------------------------------
+# Prerendering
+#-----------------------------------------------------------------------------
+def prerender(oinfos, processes=None, progress=None):
+    """
+    Render the pages of many objects into the render cache.
+
+    Objects are rendered in parallel, in batches that are stored in the
+    cache as soon as they're done, so the cache is filled in even if the
+    run is interrupted. Set the ``disk_cache`` option to keep the pages
+    across sessions; they're then pinned (see `pin_pages`), so they're
+    never pruned.
+
+    Parameters
+    ----------
+    oinfos : dict
+        Object info dictionaries, by name (see `build_oinfos`).
+
+    processes : int, optional
+        Number of worker processes (see `RenderPool`).
+
+    progress : callable, optional
+        Called after each batch with the number of objects done (rendered,
+        cached or failed) and the total number of objects.
+
+    Returns
+    -------
+    A dict with the number of ``rendered`` and ``cached`` objects, and the
+    list of names of the objects that ``failed`` to render.
+    """
+    __, keys = lookup_rich_reprs(oinfos)
+    names = list(keys)
+    result = {
+        'rendered': 0,
+        'cached': len(oinfos) - len(names),
+        'failed': [],
+        }
+    if progress is not None:
+        progress(result['cached'], len(oinfos))
+    if not names:
+        pin_pages(oinfos)
+        return result
+
+    with RenderPool(processes) as pool:
+        batch_size = pool.processes * RENDER_CHUNKSIZE
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            try:
+                pool.rich_repr_many({name: oinfos[name] for name in batch})
+                result['rendered'] += len(batch)
+            except Exception:
+                # Find out which objects fail by rendering them one by one
+                for name in batch:
+                    try:
+                        pool.rich_repr_many({name: oinfos[name]})
+                        result['rendered'] += 1
+                    except Exception:
+                        result['failed'].append(name)
+            if progress is not None:
+                progress(result['cached'] + start + len(batch), len(oinfos))
+    pin_pages(oinfos)
+    return result
@@ -0,0 +1,457 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Persistent Sphinx applications to render docstrings.
+
+Creating a Sphinx application loads the configuration, sets up every
+extension and initializes the builder and the environment, which takes
+much longer than building a single docstring. Renderers keep a warm
+application around and feed new docstrings through it instead.
+
+Each docstring is a document named after a hash of its source, so the
+doctrees of the most recently rendered docstrings stay in the application
+environment, and rendering them again skips parsing and transforms.
+
+Documents only exist in memory: their sources are passed to Sphinx as it
+reads them, their doctrees are kept in the environment and the environment
+is never saved, so renders don't write anything but their output. Sphinx
+versions before 9 need an empty placeholder file for each source, and
+versions before 7.2 still write doctrees to the doctree dir.
+"""
+
+# Stdlib imports
+import atexit
+import base64
+import hashlib
+import mimetypes
+import os
+import os.path as osp
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Local imports
+from . import options
+from .cache import (PLOT_CACHE_DIRNAME, RENDERER_PREFIX, shared_static_dir,
+                    touch)
+from .stats import stage
+from .utils import link_tree, to_unicode_from_fs
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+DOCNAME = 'docstring'
+
+# Build output dirs with the files referenced by the rendered docstrings
+ASSET_DIRS = ['_images', '_downloads']
+
+# Extensions docrepr itself needs on every application
+BUILTIN_EXTENSIONS = ['docrepr.builders']
+
+# Extension of the plot directive, whose images are cached by docrepr.plots
+PLOT_EXTENSION = 'matplotlib.sphinxext.plot_directive'
+
+# Renderers shared by all sphinxify calls in this process
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+# Held by any renderer that creates or runs its application, since Sphinx
+# replaces the global directive and role lookups of docutils while reading
+_build_lock = threading.Lock()
+
+
+#-----------------------------------------------------------------------------
+# Renderer
+#-----------------------------------------------------------------------------
+class Renderer:
+    """
+    A long-lived Sphinx application that renders docstrings.
+
+    Parameters
+    ----------
+    confdir : str
+        Directory containing the Sphinx ``conf.py`` file.
+
+    output_format : str
+        It can be either `html` or `text`.
+
+    extensions : list of str
+        Sphinx extensions to load in the application.
+
+    basedir : str
+        Directory under which the renderer creates its working directory.
+    """
+
+    def __init__(self, confdir, output_format, extensions, basedir):
+        self.confdir = confdir
+        self.output_format = output_format
+        self.extensions = list(extensions)
+        self.basedir = basedir
+        self.workdir = None
+        self.app = None
+        self.lock = threading.RLock()
+        # Sources of the documents in the environment, by document name
+        self._documents = OrderedDict()
+        self._static_dir = None
+        # Whether documents need placeholder files in the source dir
+        self._placeholders = True
+
+    @property
+    def suffix(self):
+        """Suffix of the files produced by the builder."""
+        return '.html' if self.output_format == 'html' else '.txt'
+
+    def _create_app(self, html_context):
+        """Create the working directory and the Sphinx application."""
+        import sphinx
+        from sphinx.application import Sphinx
+
+        from .builders import MemoryProject
+
+        os.makedirs(self.basedir, exist_ok=True)
+        self.workdir = to_unicode_from_fs(
+            tempfile.mkdtemp(prefix=RENDERER_PREFIX, dir=self.basedir))
+        srcdir = osp.join(self.workdir, 'src')
+        os.mkdir(srcdir)
+        # The master document must exist before the app is created
+        with open(self.source_path(srcdir), 'w', encoding='utf-8'):
+            pass
+
+        confoverrides = {
+            'html_context': html_context,
+            'extensions': BUILTIN_EXTENSIONS + self.extensions,
+            }
+        if PLOT_EXTENSION in self.extensions:
+            # Plot code runs in a dir of its own, rather than one shared
+            # with other renderers and processes
+            plot_dir = osp.join(self.workdir, 'plots')
+            os.mkdir(plot_dir)
+            confoverrides['extensions'].append('docrepr.plots')
+            confoverrides['plot_working_directory'] = plot_dir
+            confoverrides['docrepr_plot_cache_dir'] = osp.join(
+                self.basedir, PLOT_CACHE_DIRNAME)
+        self.app = Sphinx(
+            srcdir,
+            self.confdir,
+            osp.join(self.workdir, 'build'),
+            osp.join(self.workdir, 'doctrees'),
+            self.output_format,
+            confoverrides,
+            status=None,
+            warning=None,
+            freshenv=True,
+            warningiserror=False,
+            tags=None,
+            )
+        # Sources are never written to the source dir, so they're passed to
+        # Sphinx when it reads them
+        self.app.connect('source-read', self._read_source)
+        self.app.connect('doctree-read', self._mark_orphan)
+        # Documents have no doctree files or sources to compare, so new
+        # documents are told apart by name instead
+        self.app.env.get_outdated_files = self._get_outdated_files
+        self._placeholders = sphinx.version_info < (9,)
+        if not self._placeholders:
+            project = MemoryProject(
+                srcdir, self.app.config.source_suffix, self._documents)
+            self.app.project = self.app.env.project = project
+
+    @staticmethod
+    def source_path(srcdir, docname=DOCNAME):
+        """Path of the reST source of `docname` inside `srcdir`."""
+        return osp.join(srcdir, docname + '.rst')
+
+    @staticmethod
+    def docname(docstring):
+        """Name of the document used to build `docstring`."""
+        digest = hashlib.sha256(docstring.encode('utf-8')).hexdigest()
+        return '%s-%s' % (DOCNAME, digest[:16])
+
+    def _read_source(self, app, docname, source):
+        if docname in self._documents:
+            source[0] = self._documents[docname]
+
+    def _get_outdated_files(self, config_changed):
+        # Documents are named after a hash of their source, so they never
+        # change and there's no need to check their files
+        env = self.app.env
+        removed = set(env.all_docs) - env.found_docs
+        if config_changed:
+            return set(env.found_docs), set(), removed
+        return env.found_docs - set(env.all_docs), set(), removed
+
+    @staticmethod
+    def _mark_orphan(app, doctree):
+        # Documents are not in any toctree, and warning about it each time
+        # the environment is updated takes longer than the build itself
+        app.env.metadata[app.env.docname]['orphan'] = True
+
+    def _add_documents(self, docstrings):
+        """
+        Add the documents of `docstrings` to the source dir.
+
+        Documents already in the environment are reused, so only new ones
+        are read by the next build. The least recently used documents are
+        removed to keep at most `doctree_cache_size` of them (see
+        `docrepr.options`), except those of `docstrings`.
+        """
+        docnames = []
+        for docstring in docstrings:
+            docname = self.docname(docstring)
+            docnames.append(docname)
+            if docname in self._documents:
+                self._documents.move_to_end(docname)
+                continue
+            if self._placeholders:
+                with open(self.source_path(self.app.srcdir, docname), 'w',
+                          encoding='utf-8'):
+                    pass
+            self._documents[docname] = docstring
+
+        max_documents = max(options['doctree_cache_size'], len(docnames))
+        pickled_doctrees = getattr(
+            self.app.env, '_pickled_doctree_cache', None)
+        while len(self._documents) > max_documents:
+            docname, __ = self._documents.popitem(last=False)
+            paths = []
+            if self._placeholders:
+                paths.append(self.source_path(self.app.srcdir, docname))
+            if pickled_doctrees is None:
+                paths.append(
+                    osp.join(self.app.doctreedir, docname + '.doctree'))
+            else:
+                pickled_doctrees.pop(docname, None)
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return docnames
+
+    def _build(self, docnames):
+        """
+        Build documents, like `Sphinx.build` does for their files.
+
+        The environment is not saved, since it's never loaded again, and
+        documents are looked up by name, since their sources may not be in
+        the source dir.
+        """
+        from sphinx.util.parallel import SerialTasks
+
+        builder = self.app.builder
+        updated = set(builder.read())
+        updated.update(self.app.env.check_dependents(self.app, updated))
+        builder.finish_tasks = SerialTasks()
+        builder.write(docnames, list(updated), 'specific')
+        builder.finish()
+        builder.finish_tasks.join()
+
+    def render(self, docstring, html_context, destdir=None):
+        """
+        Build `docstring` and return the processed content.
+
+        Parameters
+        ----------
+        docstring : str
+            A reST-formatted docstring
+
+        html_context : dict
+            Variables passed to the ``layout.html`` template.
+
+        destdir : str, optional
+            Directory into which the build output (images, static files,
+            etc) is merged after the build. If None, the output is kept in
+            memory instead, with images inlined as data URIs.
+
+        Returns
+        -------
+        The processed content, or None if the builder produced no output.
+        Exceptions raised by Sphinx propagate after resetting the renderer.
+        """
+        return self.render_many([docstring], html_context, destdir)[0]
+
+    def render_many(self, docstrings, html_context, destdir=None):
+        """
+        Build several docstrings at once, as documents of a single build.
+
+        See `render` for the parameters. Returns a list with the processed
+        content of each docstring, in the same order.
+        """
+        with self.lock:
+            # The working directory may have been evicted from the cache dir
+            if self.workdir is not None and not osp.isdir(self.workdir):
+                self.reset()
+            if self.app is None:
+                with stage('create_app'), _build_lock:
+                    self._create_app(html_context)
+            self.app.config.html_context = html_context
+            touch(self.workdir)
+
+            docnames = self._add_documents(docstrings)
+
+            in_memory = destdir is None
+            captured = {} if in_memory else None
+            if not in_memory:
+                # Remove the output of the previous build so it's not
+                # mistaken for (or merged along with) this one
+                for docname in docnames:
+                    output_name = osp.join(
+                        self.app.outdir, docname + self.suffix)
+                    if osp.exists(output_name):
+                        os.remove(output_name)
+                shutil.rmtree(
+                    osp.join(self.app.outdir, '_images'), ignore_errors=True)
+
+            self.app.builder.captured = captured
+            try:
+                with stage('build'), _build_lock:
+                    self._build(list(OrderedDict.fromkeys(docnames)))
+            except BaseException:
+                # The environment may be half-updated, so start over
+                self.reset()
+                raise
+            finally:
+                if self.app is not None:
+                    self.app.builder.captured = None
+
+            if in_memory:
+                outputs = []
+                with stage('read_output'):
+                    for docname in docnames:
+                        output = captured.get(docname)
+                        if output is not None:
+                            output = self._inline_images(output)
+                        outputs.append(output)
+                return outputs
+
+            outputs = []
+            with stage('read_output'):
+                for docname in docnames:
+                    output_name = osp.join(
+                        self.app.outdir, docname + self.suffix)
+                    output = None
+                    if osp.exists(output_name):
+                        with open(output_name, encoding='utf-8') as fid:
+                            output = fid.read()
+                    outputs.append(output)
+
+            with stage('place_output'):
+                self._place_output(destdir)
+
+            return outputs
+
+    def _place_output(self, destdir):
+        """
+        Place the files referenced by the last build in `destdir`.
+
+        Files are hard-linked rather than copied, and the static files,
+        which are the same for every build, are shared with all other pages
+        through a link to a common dir.
+        """
+        outdir = str(self.app.outdir)
+        for name in ASSET_DIRS:
+            if osp.isdir(osp.join(outdir, name)):
+                link_tree(osp.join(outdir, name), osp.join(destdir, name))
+
+        static_dir = osp.join(outdir, '_static')
+        dest_static_dir = osp.join(destdir, '_static')
+        if not osp.isdir(static_dir):
+            return
+        if self._static_dir is None or not osp.isdir(self._static_dir):
+            self._static_dir = shared_static_dir(static_dir, self.basedir)
+        touch(self._static_dir)
+        if osp.lexists(dest_static_dir):
+            return
+        try:
+            os.symlink(self._static_dir, dest_static_dir,
+                       target_is_directory=True)
+        except FileExistsError:
+            # Placed by another build at the same time
+            return
+        except OSError:
+            # Symlinks may not be available (e.g. on Windows). Never link
+            # files through a link placed by another build, since that
+            # would replace the shared files with themselves.
+            if not osp.lexists(dest_static_dir):
+                link_tree(self._static_dir, dest_static_dir)
+
+    def _inline_images(self, output):
+        """Replace the references to build images with data URIs."""
+        images = getattr(self.app.builder, 'images', None)
+        if not images:
+            return output
+        for source, name in images.items():
+            path = osp.join(self.app.srcdir, source)
+            mimetype = mimetypes.guess_type(path)[0]
+            try:
+                with open(path, 'rb') as image:
+                    data = base64.b64encode(image.read()).decode('ascii')
+            except OSError:
+                continue
+            output = output.replace(
+                '"_images/%s"' % name,
+                '"data:%s;base64,%s"' % (mimetype, data))
+        return output
+
+    def reset(self):
+        """Discard the Sphinx application and its working directory."""
+        with self.lock:
+            self.app = None
+            self._documents.clear()
+            self._static_dir = None
+            if self.workdir is not None:
+                shutil.rmtree(self.workdir, ignore_errors=True)
+                self.workdir = None
+
+    close = reset
+
+
+#-----------------------------------------------------------------------------
+# Renderer registry
+#-----------------------------------------------------------------------------
+def get_renderer(confdir, output_format, extensions, basedir):
+    """
+    Return the shared renderer for a configuration, creating it if needed.
+
+    There is one renderer per conf dir, output format and extension set.
+    """
+    key = (confdir, output_format, tuple(extensions), basedir)
+    with _renderers_lock:
+        renderer = _renderers.get(key)
+        if renderer is None:
+            renderer = Renderer(confdir, output_format, extensions, basedir)
+            _renderers[key] = renderer
+    return renderer
+
+
+def reset_renderers():
+    """
+    Discard all the shared renderers.
+
+    Use this if a renderer gets into a bad state; a fresh Sphinx application
+    is created on the next render.
+    """
+    with _renderers_lock:
+        renderers = list(_renderers.values())
+        _renderers.clear()
+    for renderer in renderers:
+        renderer.reset()
+
+
+def _forget_renderers():
+    """Drop the renderers inherited from the parent of a forked process."""
+    global _renderers_lock, _build_lock
+    # Their working directories still belong to the parent, so they must
+    # not be reused or removed here
+    _renderers.clear()
+    _renderers_lock = threading.Lock()
+    _build_lock = threading.Lock()
+
+
+atexit.register(reset_renderers)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_renderers)
@@ -0,0 +1,340 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Render server shared by several processes.
+
+``python -m docrepr serve`` starts a server that renders object info dicts
+sent by other processes (e.g. the kernels of several IPython sessions), so
+they all share its warm renderers and render cache instead of each paying
+for Sphinx startup on its own.
+
+The server only listens on localhost, and advertises its port and a random
+access token in `SERVER_FILENAME`, inside the cache directory. That file
+can only be read by its owner, so other users can't send renders, and
+clients ignore it unless only they can write to it and to the cache
+directory, so other users can't plant one either. While it exists and the
+server process is running, `rich_repr` and `rich_repr_html` send their
+renders to the server (see `request_render`), and render them in-process
+if it can't be reached or is busy with other requests. Pool workers (see
+`RenderPool`) always render in-process.
+"""
+
+# Stdlib imports
+import hmac
+import http.client
+import http.server
+import json
+import os
+import os.path as osp
+import secrets
+import signal
+import stat
+import sys
+
+# Local imports
+from . import __version__, options
+from .cache import RUNTIME_OPTIONS, SERVER_FILENAME
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+# Functions of docrepr.sphinxify that clients can call on the server
+SERVED_FUNCTIONS = {'rich_repr_many', 'rich_repr_html'}
+
+# Maximum time to wait for a render, in seconds. Renders by a warm server
+# take much less, so waiting longer means it's busy with other requests and
+# rendering in-process is faster.
+REQUEST_TIMEOUT = 2
+
+# Object info dict rendered to warm up the server before it's advertised
+WARM_UP_OINFO = {
+    'name': 'warm_up',
+    'type_name': 'function',
+    'docstring': 'Render :math:`x^2` and *roles*.',
+    }
+
+
+#-----------------------------------------------------------------------------
+# Client
+#-----------------------------------------------------------------------------
+def _is_private(stat_result):
+    """Check that only the current user can write to a file or dir."""
+    if os.name != 'posix':
+        return True
+    return (stat_result.st_uid == os.getuid()
+            and not stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _is_in_dir(path, directory):
+    directory = osp.realpath(directory)
+    try:
+        return osp.commonpath([osp.realpath(path), directory]) == directory
+    except ValueError:
+        # On another drive
+        return False
+
+
+def read_server_file(cachedir):
+    """
+    Return the address info of the server running on `cachedir`.
+
+    This is a dict with its ``port``, ``token`` and ``pid``, or None if no
+    server is running. Server files that other users could have written,
+    or that are in a cache directory they can write to, are ignored.
+    """
+    try:
+        if not _is_private(os.stat(cachedir)):
+            return None
+        with open(osp.join(cachedir, SERVER_FILENAME),
+                  encoding='utf-8') as server_file:
+            if not _is_private(os.fstat(server_file.fileno())):
+                return None
+            server = json.load(server_file)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(server, dict)
+            or not isinstance(server.get('port'), int)
+            or not isinstance(server.get('token'), str)):
+        return None
+    return server
+
+
+def process_exists(pid):
+    """Check whether a process with the given pid is running."""
+    if os.name != 'posix' or not isinstance(pid, int) or pid <= 0:
+        # Can't tell (signals terminate processes on Windows)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Owned by another user
+        pass
+    return True
+
+
+def request_render(cachedir, function, oinfos):
+    """
+    Render object info dicts with the server running on `cachedir`.
+
+    Parameters
+    ----------
+    cachedir : str
+        Cache directory the server was started on.
+
+    function : str
+        Function of `docrepr.sphinxify` to render them with, one of
+        `SERVED_FUNCTIONS`.
+
+    oinfos : list of dict
+        Object info dictionaries, with JSON-serializable values.
+
+    Returns
+    -------
+    The list of outputs of the function for each object info dict, or None
+    if there's no server, it couldn't render them or its response is not
+    valid.
+    """
+    server = read_server_file(cachedir)
+    if server is None or not process_exists(server.get('pid')):
+        return None
+
+    # The server renders with the options of the caller
+    render_options = {
+        name: value for name, value in options.items()
+        if name not in RUNTIME_OPTIONS
+        }
+    try:
+        body = json.dumps({
+            'version': __version__,
+            'function': function,
+            'options': render_options,
+            'oinfos': oinfos,
+            }).encode('utf-8')
+    except (TypeError, ValueError):
+        return None
+
+    connection = http.client.HTTPConnection(
+        '127.0.0.1', server['port'], timeout=REQUEST_TIMEOUT)
+    try:
+        connection.request('POST', '/render', body, {
+            'Authorization': 'Bearer ' + server['token'],
+            'Content-Type': 'application/json',
+            })
+        response = connection.getresponse()
+        data = response.read()
+        if response.status != 200:
+            return None
+        outputs = json.loads(data.decode('utf-8'))['outputs']
+    except (OSError, http.client.HTTPException, ValueError, KeyError,
+            TypeError):
+        return None
+    finally:
+        connection.close()
+
+    if (not isinstance(outputs, list) or len(outputs) != len(oinfos)
+            or not all(isinstance(output, str) for output in outputs)):
+        return None
+    # Pages must be in the cache directory, where only we can write
+    if function == 'rich_repr_many' and not all(
+            _is_in_dir(output, cachedir) for output in outputs):
+        return None
+    return outputs
+
+
+#-----------------------------------------------------------------------------
+# Server
+#-----------------------------------------------------------------------------
+class RenderRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Handler of the render requests sent by `request_render`."""
+
+    def do_POST(self):
+        authorization = self.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization,
+                                   'Bearer ' + self.server.token):
+            self.send_error(403)
+            return
+        if self.path != '/render':
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            if request['function'] not in SERVED_FUNCTIONS:
+                raise ValueError('Unknown function')
+        except (KeyError, TypeError, ValueError):
+            self.send_error(400)
+            return
+        if request.get('version') != __version__:
+            # Clients of other versions render pages differently
+            self.send_error(409)
+            return
+
+        try:
+            outputs = self.server.render(
+                request['function'], request['options'], request['oinfos'])
+        except Exception as error:
+            # Clients render in-process instead, and get the error there
+            self.send_error(500, explain=str(error))
+            return
+
+        data = json.dumps({'outputs': outputs}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RenderServer(http.server.HTTPServer):
+    """
+    Server that renders object info dicts for other processes.
+
+    Requests are handled one at a time, since renders share global state
+    and are CPU-bound anyway.
+
+    Parameters
+    ----------
+    port : int, optional
+        Port to listen on, on localhost. By default a free one is picked.
+
+    cachedir : str, optional
+        Cache directory to render in and advertise the server on. Defaults
+        to `docrepr.sphinxify.CACHEDIR`.
+
+    verbose : bool, optional
+        Whether to log every request to stderr.
+    """
+
+    def __init__(self, port=0, cachedir=None, verbose=False):
+        from . import sphinxify
+
+        super().__init__(('127.0.0.1', port), RenderRequestHandler)
+        if cachedir is not None:
+            sphinxify.CACHEDIR = cachedir
+        self.cachedir = sphinxify.CACHEDIR
+        self.token = secrets.token_hex(16)
+        self.verbose = verbose
+
+    @property
+    def server_file_path(self):
+        return osp.join(self.cachedir, SERVER_FILENAME)
+
+    def advertise(self):
+        """Write the server file, so that clients start using the server."""
+        os.makedirs(self.cachedir, mode=0o700, exist_ok=True)
+        data = json.dumps({
+            'port': self.server_port,
+            'token': self.token,
+            'pid': os.getpid(),
+            })
+        temp_file_path = self.server_file_path + '.%d.tmp' % os.getpid()
+        descriptor = os.open(
+            temp_file_path, os.O_CREAT | os.O_TRUNC | os.O_WRONLY, 0o600)
+        with open(descriptor, 'w', encoding='utf-8') as server_file:
+            server_file.write(data)
+        os.replace(temp_file_path, self.server_file_path)
+
+    def warm_up(self):
+        """Start the renderers, so that the first requests are fast too."""
+        self.render('rich_repr_html', {}, [WARM_UP_OINFO])
+
+    def render(self, function, render_options, oinfos):
+        """Render object info dicts with a function of `SERVED_FUNCTIONS`."""
+        from . import sphinxify
+
+        options.update(
+            {name: value for name, value in render_options.items()
+             if name in options and name not in RUNTIME_OPTIONS},
+            # Don't send renders back to ourselves
+            render_server=False,
+            )
+        if function == 'rich_repr_many':
+            output_file_paths = sphinxify.rich_repr_many(
+                dict(enumerate(oinfos)))
+            return [output_file_paths[index] for index in range(len(oinfos))]
+        return [sphinxify.rich_repr_html(oinfo) for oinfo in oinfos]
+
+    def server_close(self):
+        # Only remove the server file if another server didn't replace it
+        server = read_server_file(self.cachedir)
+        if server is not None and server.get('token') == self.token:
+            try:
+                os.remove(self.server_file_path)
+            except OSError:
+                pass
+        super().server_close()
+
+
+def serve(port=0, cachedir=None, verbose=False):
+    """
+    Run a render server until interrupted.
+
+    See `RenderServer` for the parameters.
+    """
+    server = RenderServer(port, cachedir, verbose)
+    # Clean up the server file when stopped with SIGTERM too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.warm_up()
+        server.advertise()
+        if read_server_file(server.cachedir) is None:
+            print('Warning: other users can write to %s, so clients will '
+                  'not use this server' % server.cachedir, file=sys.stderr)
+        print('Serving docrepr renders on http://127.0.0.1:%d (cache '
+              'directory: %s)' % (server.server_port, server.cachedir),
+              flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -19,6 +19,11 @@
 """
 
 # Stdlib imports
+import atexit
+import functools
+import hashlib
+import importlib.util
+import math
 import os
 import os.path as osp
 import re
@@ -26,17 +31,18 @@
 import sys
 import tempfile
 import textwrap
+from html import escape
 from pathlib import Path
-from xml.sax.saxutils import escape
-
-# 3rd party imports
-from docutils.utils import SystemMessage
-from jinja2 import Environment, FileSystemLoader
-from sphinx.application import Sphinx
 
 # Local imports
 from . import options
-from .utils import merge_directories, to_unicode_from_fs
+from .cache import (CONFDIR_PREFIX, RENDER_CACHE_DIRNAME, SERVER_FILENAME,
+                    TEMPLATE_CACHE_DIRNAME, cache_key, make_render_dir,
+                    publish_dir, purge_cachedir, render_cache, touch)
+from .renderer import get_renderer, reset_renderers
+from .stats import (RenderStats, add_observer, count, current_stats, record,
+                    recorded, remove_observer, stage)
+from .utils import minify_css, minify_js, to_unicode_from_fs
 
 
 #-----------------------------------------------------------------------------
@@ -53,6 +59,71 @@
     username = to_unicode_from_fs(os.environ.get('USER'))
     CACHEDIR = tempfile.gettempdir() + osp.sep + 'docrepr-' + str(username)
 
+# Files copied to the conf dirs made by `generate_conf`, relative to
+# CONFDIR_PATH
+CONF_FILES = ['conf.py', osp.join('templates', 'layout.html')]
+
+# Keys of the object info dict a rich representation depends on
+OINFO_KEYS = [
+    'name', 'Name', 'type_name', 'file', 'docstring', 'class_docstring',
+    'init_docstring', 'call_docstring', 'definition', 'call_definition',
+    'call_def', 'init_definition',
+    ]
+
+# Memory addresses in object reprs, e.g. in the default values of a
+# definition, which change from one session to the next
+ADDRESS_RE = re.compile(r' at 0x[0-9a-fA-F]+')
+
+# Markup that requires each of the optional Sphinx extensions. Indentation
+# is matched with [^\S\n]* rather than \s*, which would make searches take
+# quadratic time on blank lines.
+EXTENSION_MARKUP_RE = {
+    'sphinx.ext.autosummary': re.compile(
+        r'^[^\S\n]*\.\. autosummary::|:autolink:`', re.MULTILINE),
+    'sphinx.ext.mathjax': re.compile(
+        r'^[^\S\n]*\.\. math::|:math:`', re.MULTILINE),
+    'matplotlib.sphinxext.plot_directive': re.compile(
+        r'^[^\S\n]*\.\. plot::', re.MULTILINE),
+    }
+
+# Plot directives and their options, which `plot_sources` replaces with
+# their source code
+PLOT_DIRECTIVE_RE = re.compile(r'^([^\S\n]*)\.\. plot::')
+DIRECTIVE_OPTION_RE = re.compile(r'^[^\S\n]*:[\w-]+:')
+
+# Sphinx-style fields, which need a Sphinx domain directive
+SPHINX_FIELDS_RE = re.compile(r'\n[^\S\n]*:(?:param |return: |raise )')
+
+# Closing parentheses of signatures, with and without a trailing comma
+SIGNATURE_CLOSE_RE = re.compile(r'(?<=[\w\]\}\'"])\)')
+SIGNATURE_END_RE = re.compile(r'(?<=[\w\]\}\'"])\)(?!,)')
+
+# Maximum number of objects sent to a worker process at once
+RENDER_CHUNKSIZE = 8
+
+# JS files included verbatim by our templates
+INCLUDED_JS = ['fix_image_paths.js', 'math_config.js']
+
+# Stylesheets and scripts of rich_repr pages, unless the legacy jQuery and
+# Bootstrap bundle is used (see the `legacy_assets` option)
+PAGE_CSS = ['base.css', 'default.css', 'pygments.css']
+PAGE_JS = ['docrepr.js']
+
+# Template to render docstrings processed without Sphinx in our layout
+SPHINXIFY_LAYOUT = (
+    '{% extends "layout.html" %}{% block body %}{{ body }}{% endblock %}')
+
+# Jinja environment shared by all renders, with its bytecode cache dir
+_template_env = None
+
+# Conf dirs generated by `managed_confdir`, by cache dir
+_managed_confdirs = {}
+
+# Pool of one worker process for `sphinxify_in_background`, and the id of
+# the process that started it
+_background_pool = None
+_background_pool_pid = None
+
 DOCSTRING_TEMPLATE = """
 .. py:{type_name}:: {name}{definition}
 
@@ -64,45 +135,196 @@
 #-----------------------------------------------------------------------------
 def is_sphinx_markup(docstring):
     """Returns whether a string contains Sphinx-style reST markup."""
-    return bool(re.search(r'\n\s*:param ', docstring)
-                or re.search(r'\n\s*:return: ', docstring)
-                or re.search(r'\n\s*:raise ', docstring))
+    return bool(SPHINX_FIELDS_RE.search(docstring))
+
+
+def template_environment():
+    """
+    Return the Jinja environment that loads our templates.
+
+    The environment is created once, with the JS files included by the
+    templates read in advance, so templates are only loaded and compiled
+    the first time they are used. If the `template_bytecode_cache` option
+    is set, compiled templates are also stored in `CACHEDIR`.
+    """
+    global _template_env
+
+    if options['template_bytecode_cache']:
+        bytecode_dir = osp.join(CACHEDIR, TEMPLATE_CACHE_DIRNAME)
+    else:
+        bytecode_dir = None
+    # The bytecode cache dir may have been pruned from CACHEDIR
+    if (_template_env is not None and _template_env[0] == bytecode_dir
+            and (bytecode_dir is None or osp.isdir(bytecode_dir))):
+        return _template_env[1]
+
+    from jinja2 import (ChoiceLoader, DictLoader, Environment,
+                        FileSystemBytecodeCache, FileSystemLoader,
+                        FunctionLoader)
+
+    # Templates include JS files by their full path
+    snippets = {'sphinxify_layout.html': SPHINXIFY_LAYOUT}
+    for name in INCLUDED_JS:
+        with open(osp.join(JS_PATH, name), encoding='utf-8') as js_file:
+            snippets[JS_PATH + '/' + name] = js_file.read()
+
+    bytecode_cache = None
+    if bytecode_dir is not None:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+
+    env = Environment(
+        loader=ChoiceLoader([
+            FileSystemLoader(osp.join(CONFDIR_PATH, 'templates')),
+            DictLoader(snippets),
+            FunctionLoader(load_inline_asset),
+            ]),
+        bytecode_cache=bytecode_cache,
+        # Our templates don't change while running
+        auto_reload=False,
+        )
+    _template_env = (bytecode_dir, env)
+    return env
+
+
+def load_inline_asset(name):
+    """
+    Load the minified page assets embedded in rich_repr pages.
+
+    This is a Jinja loader function for the ``inline_assets.css`` and
+    ``inline_assets.js`` templates, so assets are only read and minified
+    when the `inline_assets` option is used.
+    """
+    def read(directory, asset_name):
+        with open(osp.join(directory, asset_name), encoding='utf-8') as asset:
+            return asset.read()
+
+    if name == 'inline_assets.css':
+        assets = [minify_css(read(CSS_PATH, css_name), CSS_PATH)
+                  for css_name in PAGE_CSS]
+    elif name == 'inline_assets.js':
+        assets = [minify_js(read(JS_PATH, js_name)) for js_name in PAGE_JS]
+    else:
+        return None
+    return '{% raw %}' + '\n'.join(assets) + '{% endraw %}'
 
 
 def warning(message):
     """Print a warning message on the rich text view."""
-    env = Environment()
-    env.loader = FileSystemLoader(osp.join(CONFDIR_PATH, 'templates'))
+    env = template_environment()
     warning_template = env.get_template('warning.html')
     return warning_template.render(css_path=CSS_PATH, text=message)
 
 
+class _NextFinder:
+    """
+    Find the next occurrence of something in a text, from a position.
+
+    Positions must be non-decreasing between calls, which allows reusing
+    the last result, so that all the calls take linear time in total.
+    """
+
+    def __init__(self, find):
+        self._find = find
+        self._found = None
+
+    def __call__(self, pos):
+        if self._found is None or (self._found != -1 and self._found < pos):
+            self._found = self._find(pos)
+        return self._found
+
+
+def _regex_finder(pattern, text):
+    def find(pos):
+        match = pattern.search(text, pos)
+        return match.start() if match else -1
+    return _NextFinder(find)
+
+
+def _continued_signature_end(text, pos, ends):
+    """
+    Find the end of a signature continued on the line starting at `pos`.
+
+    Each line ending in "),", is followed by another one, and the signature
+    ends at the last parenthesis that can close it on the last line that
+    has one. `ends` caches the results by line. Returns None if there is
+    no such parenthesis.
+    """
+    lines = []
+    while pos not in ends:
+        line_end = text.find('\n', pos)
+        if line_end == -1:
+            line_end = len(text)
+        lines.append((pos, line_end))
+        if not (line_end < len(text) and line_end - 2 > pos
+                and text.startswith('),', line_end - 2)):
+            break
+        pos = line_end + 1
+
+    end = ends.get(pos)
+    for line_start, line_end in reversed(lines):
+        if end is None:
+            for match in SIGNATURE_CLOSE_RE.finditer(
+                    text, line_start + 1, line_end):
+                end = match.end()
+        ends[line_start] = end
+    return end
+
+
 def get_signature_from_text(text, objname):
     """Get object signatures from text (object documentation).
 
     Return a list containing a single string in most cases
     Example of multiple signatures: PyQt4 objects
+
+    This is a single pass over `text`, so it takes linear time even on
+    large docstrings with many parentheses.
     """
     # Default values
     if not text:
         text = ''
     if not objname:
         objname = ''
-    # Regexps
-    oneline_re = objname + r'\([^\)].+?(?<=[\w\]\}\'"])\)(?!,)'
-    multiline_re = objname + r'\([^\)]+(?<=[\w\]\}\'"])\)(?!,)'
-    multiline_end_parenleft_re = r'(%s\([^\)]+(\),\n.+)+(?<=[\w\]\}\'"])\))'
-    # Grabbing signatures
-    sigs_1 = re.findall(oneline_re + '|' + multiline_re, text)
-    sigs_2 = [g[0] for g in re.findall(
-        multiline_end_parenleft_re % objname, text)]
-    all_sigs = sigs_1 + sigs_2
+    prefix = objname + '('
+    next_newline = _NextFinder(lambda pos: text.find('\n', pos))
+    next_paren = _NextFinder(lambda pos: text.find(')', pos))
+    next_end = _regex_finder(SIGNATURE_END_RE, text)
+
     # The most relevant signature is usually the first one. There could be
     # others in doctests but those are not so important
-    if all_sigs:
-        sig = all_sigs[0]
-        sig = '(' + sig.split('(')[-1] # Remove objname
-        return sig
+    signature = None
+    start = text.find(prefix)
+    while start != -1 and signature is None:
+        paren = start + len(objname)
+        first_paren = next_paren(paren + 1)
+        if first_paren > paren + 1:
+            # Signatures in a single line, with arbitrary contents
+            end = next_end(paren + 3)
+            newline = next_newline(paren + 2)
+            if end != -1 and (newline == -1 or end < newline):
+                signature = text[paren:end + 1]
+            # Signatures up to the first closing parenthesis
+            elif SIGNATURE_END_RE.match(text, first_paren):
+                signature = text[paren:first_paren + 1]
+        start = text.find(prefix, start + 1)
+
+    if signature is None:
+        # Signatures broken in lines ending with "),"
+        next_paren = _NextFinder(lambda pos: text.find(')', pos))
+        ends = {}
+        start = text.find(prefix)
+        while start != -1 and signature is None:
+            paren = start + len(objname)
+            first_paren = next_paren(paren + 1)
+            if (first_paren > paren + 1
+                    and text.startswith('),\n', first_paren)):
+                end = _continued_signature_end(text, first_paren + 3, ends)
+                if end is not None:
+                    signature = text[paren:end]
+            start = text.find(prefix, start + 1)
+
+    if signature:
+        return '(' + signature[signature.rfind('(') + 1:]  # Remove objname
     return ''
 
 
@@ -150,6 +372,25 @@ def get_signature_from_oinfo(oinfo):
         name=oinfo.get('Name'), docstring=docstring, definition=definition)
 
 
+def render_cache_dir():
+    """Return the on-disk render cache directory, or None if disabled."""
+    if options['disk_cache']:
+        return osp.join(CACHEDIR, RENDER_CACHE_DIRNAME)
+    return None
+
+
+def purge_cache():
+    """
+    Remove all cached renders, both in memory and in `CACHEDIR`.
+
+    This also resets the renderers, whose working directories live in
+    `CACHEDIR` too.
+    """
+    reset_renderers()
+    render_cache.clear()
+    purge_cachedir(CACHEDIR)
+
+
 def generate_conf(directory):
     """
     Generate a Sphinx configuration file in `directory`.
@@ -173,6 +414,47 @@ def generate_conf(directory):
     (Path(directory) / 'static' / 'empty').touch()
 
 
+def conf_digest(directory):
+    """Compute a hash of the `CONF_FILES` of a conf dir."""
+    digest = hashlib.sha256()
+    for name in CONF_FILES:
+        digest.update(name.encode('utf-8'))
+        with open(osp.join(directory, name), 'rb') as fid:
+            digest.update(hashlib.sha256(fid.read()).digest())
+    return digest.hexdigest()
+
+
+def managed_confdir():
+    """
+    Return a conf dir generated by `generate_conf` in `CACHEDIR`.
+
+    The dir is named after a hash of the files it's generated from, and its
+    contents are checked against it the first time it's used in a process.
+    Afterwards it's reused as is, by all calls and processes, along with
+    the renderers that use it.
+    """
+    confdir = _managed_confdirs.get(CACHEDIR)
+    if confdir is not None and osp.isdir(confdir):
+        touch(confdir)
+        return confdir
+
+    digest = conf_digest(CONFDIR_PATH)
+    confdir = osp.join(CACHEDIR, CONFDIR_PREFIX + digest[:16])
+    if osp.isdir(confdir):
+        try:
+            valid = conf_digest(confdir) == digest
+        except OSError:
+            valid = False
+        if not valid:
+            shutil.rmtree(confdir, ignore_errors=True)
+    if not osp.isdir(confdir):
+        publish_dir(confdir, generate_conf)
+
+    confdir = to_unicode_from_fs(confdir)
+    _managed_confdirs[CACHEDIR] = confdir
+    return confdir
+
+
 def global_template_vars():
     """Generate a dictionary of global variables for our templates."""
     if options['local_mathjax']:
@@ -186,11 +468,18 @@ def global_template_vars():
         'js_path': JS_PATH,
         'jquery_path': JQUERY_PATH,
         'mathjax_path': mathjax_path,
-        'math_on': 'true' if options['render_math'] else '',
+        # Whether MathJax is loaded to typeset math
+        'math_on': (
+            'true' if options['render_math'] and not options['mathml']
+            else ''),
         'platform': sys.platform,
         'collapse': options['collapse_sections'],
         'use_qt4': options['use_qt4'],
         'outline': options['outline'],
+        # Inlined assets are always the slim bundle
+        'legacy_assets': (
+            options['legacy_assets'] and not options['inline_assets']),
+        'inline_assets': options['inline_assets'],
     }
 
     return global_vars
@@ -227,23 +516,39 @@ def init_template_vars(oinfo):
     return tmpl_vars
 
 
-def generate_extensions(render_math):
-    """Generate a list of Sphinx extensions."""
+def generate_extensions(render_math, docstrings=None):
+    """
+    Generate a list of Sphinx extensions.
+
+    If `docstrings` is given, only the extensions whose markup appears in
+    any of them are included, since each one slows down every build.
+    """
+    def needed(extension):
+        if docstrings is None:
+            return True
+        markup_re = EXTENSION_MARKUP_RE[extension]
+        return any(markup_re.search(docstring) for docstring in docstrings)
+
+    extensions = []
+
     # For scipy and matplotlib docstrings, which need this extension to
     # be rendered correctly (see Spyder Issue #1138)
-    extensions = ['sphinx.ext.autosummary']
-
-     # We need mathjax to get pretty plain-text latex in docstrings
-    if render_math:
-        extensions.append('sphinx.ext.mathjax')
+    if needed('sphinx.ext.autosummary'):
+        extensions.append('sphinx.ext.autosummary')
+
+    # We need mathjax to get pretty plain-text latex in docstrings, unless
+    # math is converted to MathML when building instead
+    if render_math and needed('sphinx.ext.mathjax'):
+        if options['mathml']:
+            extensions.append('docrepr.mathml')
+        else:
+            extensions.append('sphinx.ext.mathjax')
 
-    # Plots
-    try:
-        # TODO: Add an option to avoid importing mpl every time
-        import matplotlib   # analysis:ignore
+    # Plots. Only check that matplotlib is available, since importing it
+    # takes a while and Sphinx does it anyway when loading the extension
+    if (needed('matplotlib.sphinxext.plot_directive')
+            and importlib.util.find_spec('matplotlib') is not None):
         extensions.append('matplotlib.sphinxext.plot_directive')
-    except ImportError:
-        pass
 
     return extensions
 
@@ -298,159 +603,284 @@ def wrap_class_docstring(oinfo):
     return wrapped_docstring
 
 
+def plot_sources(docstring):
+    """
+    Replace the plot directives of a docstring with their source code.
+
+    This is used to show docstrings before their plots are rendered, which
+    takes much longer. Plots read from files are left out.
+    """
+    lines = docstring.splitlines()
+    output = []
+    index = 0
+    while index < len(lines):
+        match = PLOT_DIRECTIVE_RE.match(lines[index])
+        index += 1
+        if not match:
+            output.append(lines[index - 1])
+            continue
+
+        # The directive block spans all the lines indented past it
+        indent = match.group(1)
+        block = []
+        while index < len(lines) and (
+                not lines[index].strip()
+                or (lines[index].startswith(indent)
+                    and lines[index][len(indent)].isspace())):
+            block.append(lines[index])
+            index += 1
+        while block and DIRECTIVE_OPTION_RE.match(block[0]):
+            block.pop(0)
+
+        if any(line.strip() for line in block):
+            output.append(indent + '.. code-block:: python')
+            output.extend(block)
+        else:
+            output.extend(line for line in block if not line.strip())
+    return '\n'.join(output)
+
+
 #-----------------------------------------------------------------------------
 # Sphinxify
 #-----------------------------------------------------------------------------
-def sphinxify(docstring, srcdir, output_format='html', temp_confdir=False):
+def render_layout(body, template_vars):
+    """Render a docstring's HTML body in our Sphinx layout template."""
+    with stage('template'):
+        env = template_environment()
+        page = env.get_template('sphinxify_layout.html')
+        return page.render(body=body, **template_vars)
+
+
+def run_sphinx(docstrings, template_vars, srcdir, output_format,
+               temp_confdir=False):
+    """
+    Build a list of docstrings with Sphinx, all in the same build.
+
+    See `sphinxify` for the parameters. Returns a list with the output of
+    each docstring, which is None for those that failed to build.
+    """
+    from docutils.utils import SystemMessage
+
+    extensions = generate_extensions(options['render_math'], docstrings)
+    stats = current_stats()
+    if stats is not None:
+        stats.extensions.append(extensions)
+
+    # Get a renderer. Generated conf dirs are reused, so their renderers
+    # can be too.
+    if temp_confdir:
+        confdir = managed_confdir()
+    else:
+        confdir = CONFDIR_PATH
+    renderer = get_renderer(confdir, output_format, extensions, CACHEDIR)
+
+    try:
+        return renderer.render_many(docstrings, template_vars, srcdir)
+    except SystemMessage:
+        if len(docstrings) == 1:
+            return [None]
+
+    # Build them one by one, so a bad docstring doesn't spoil the rest
+    outputs = []
+    for docstring in docstrings:
+        try:
+            outputs.append(renderer.render(docstring, template_vars, srcdir))
+        except SystemMessage:
+            outputs.append(None)
+    return outputs
+
+
+def sphinxify_template_vars(docstring):
+    """Generate the variables of the layout template for `docstring`."""
+    template_vars = global_template_vars()
+    if not docstring or docstring == '<no docstring>':
+        template_vars['warning'] = 'true'
+        template_vars['warn_message'] = 'No documentation available'
+    return template_vars
+
+
+@recorded
+def sphinxify(docstring, srcdir=None, output_format='html',
+              temp_confdir=False):
     """
     Run Sphinx on a docstring and outputs the processed content.
 
+    Docstrings that only use basic reST markup are rendered directly with
+    docutils (see `docrepr.fastpath`). Otherwise, Sphinx runs in a persistent
+    application shared by all calls with the same output format and
+    extensions (see `docrepr.renderer`), so only the first call pays for its
+    initialization. Results are cached on the docstring, output format and
+    docrepr options (see `docrepr.cache`).
+
     Parameters
     ----------
     docstring : str
         A reST-formatted docstring
 
-    srcdir : str
-        Source directory where Sphinx is going to be run
+    srcdir : str, optional
+        Directory where the build output (images, static files, etc) is
+        placed. If None, nothing is written to disk and images are inlined
+        in the output (see `docrepr.renderer` for older Sphinx versions).
 
     output_format : str
         It can be either `html` or `text`.
 
     temp_confdir : bool
-        Whether to create a temp conf dir for Sphinx
+        Whether to use a conf dir generated in `CACHEDIR` rather than the
+        one of the package (see `managed_confdir`).
 
     Returns
     -------
     A Sphinx-processed string, in either HTML or plain text format, depending
     on the value of `output_format`.
     """
-    if docstring is None:
-        docstring = ''
+    return sphinxify_many(
+        {0: docstring}, srcdir, output_format, temp_confdir)[0]
 
-    # Rst file to sphinxify
-    base_name = osp.join(srcdir, 'docstring')
-    rst_name = base_name + '.rst'
 
-    # Output file name
-    if output_format == 'html':
-        suffix = '.html'
-    else:
-        suffix = '.txt'
+@recorded
+def sphinxify_many(docstrings, srcdir=None, output_format='html',
+                   temp_confdir=False):
+    """
+    Run Sphinx on several docstrings at once.
 
-    # This is needed so users can type \\ on latex eqnarray envs inside raw
-    # docstrings
-    template_vars = global_template_vars()
-    if template_vars['math_on']:
-        docstring = docstring.replace('\\\\', '\\\\\\\\')
+    This is equivalent to calling `sphinxify` on each docstring, but all the
+    docstrings that need Sphinx are processed in a single build, which is
+    much faster than building them one at a time.
 
-    if not docstring or docstring == '<no docstring>':
-        template_vars['warning'] = 'true'
-        template_vars['warn_message'] = 'No documentation available'
+    Parameters
+    ----------
+    docstrings : dict
+        reST-formatted docstrings, by any hashable key
 
-    # Write docstring to rst_name
-    with open(rst_name, 'w', encoding='utf-8') as rst_file:
-        rst_file.write(docstring)
+    srcdir : str, optional
+        Directory where the build output (images, static files, etc) is
+        placed. If None, nothing is written to disk and images are inlined
+        in the output (see `docrepr.renderer` for older Sphinx versions).
 
-    # Create confdir
-    if temp_confdir:
-        # TODO: This may be inefficient. Find a faster way to do it.
-        confdir = tempfile.mkdtemp()
-        confdir = to_unicode_from_fs(confdir)
-        generate_conf(confdir)
-    else:
-        confdir = CONFDIR_PATH
+    output_format : str
+        It can be either `html` or `text`.
 
-    # Get extensions list
-    extensions = generate_extensions(options['render_math'])
-
-    # Override conf variables
-    confoverrides = {'html_context': template_vars, 'extensions': extensions}
-
-    # Create Sphinx app
-    doctreedir = osp.join(srcdir, 'doctrees')
-    with tempfile.TemporaryDirectory() as destdir:
-        output_name = osp.join(destdir, 'docstring') + suffix
-        sphinx_app = Sphinx(
-            srcdir,
-            confdir,
-            destdir,
-            doctreedir,
-            output_format,
-            confoverrides,
-            status=None,
-            warning=None,
-            freshenv=True,
-            warningiserror=False,
-            tags=None,
-            )
+    temp_confdir : bool
+        Whether to use a conf dir generated in `CACHEDIR` rather than the
+        one of the package (see `managed_confdir`).
 
-        # TODO: Make this message configurable, so that it can be translated
-        error_message = 'It was not possible to get rich help for this object'
-        # Run the app
-        try:
-            sphinx_app.build(None, [rst_name])
-        except SystemMessage:
-            output = warning(error_message)
-            return output
+    Returns
+    -------
+    A dict with the Sphinx-processed string of each docstring, under the
+    same keys as `docstrings`.
+    """
+    from .fastpath import render_html
+
+    cache_dir = render_cache_dir()
+    outputs = {}
+    keys = {}
+    # Docstrings that need Sphinx, grouped by their template variables
+    pending = {}
+
+    for name, docstring in docstrings.items():
+        if docstring is None:
+            docstring = ''
+
+        key = cache_key('sphinxify', docstring, output_format)
+        with stage('cache'):
+            output = render_cache.get(key, cache_dir)
+        if output is not None:
+            count('cache_hits')
+            outputs[name] = output
+            continue
+        count('cache_misses')
+        keys[name] = key
+
+        # This is needed so users can type \\ on latex eqnarray envs inside
+        # raw docstrings
+        template_vars = sphinxify_template_vars(docstring)
+        if template_vars['math_on']:
+            docstring = docstring.replace('\\\\', '\\\\\\\\')
+
+        # Simple docstrings don't need Sphinx at all
+        if (output_format == 'html' and options['docutils_fast_path']
+                and not template_vars['outline']):
+            with stage('fast_path'):
+                body = render_html(docstring)
+            if body is not None:
+                outputs[name] = render_layout(body, template_vars)
+                continue
+
+        # Only build together docstrings that need the same extensions, so
+        # that those for plots, etc don't slow down the rest
+        group = (
+            'warning' in template_vars,
+            tuple(generate_extensions(options['render_math'], [docstring])),
+            )
+        pending.setdefault(group, ([], [], template_vars))
+        pending[group][0].append(name)
+        pending[group][1].append(docstring)
 
-        # Some adjustments to the output
-        if osp.exists(output_name):
-            with open(output_name, encoding='utf-8') as fid:
-                output = fid.read()
-            output = output.replace('<pre>', '<pre class="literal-block">')
-        else:
-            output = warning(error_message)
+    for names, group_docstrings, template_vars in pending.values():
+        results = run_sphinx(
+            group_docstrings, template_vars, srcdir, output_format,
+            temp_confdir)
+        outputs.update(zip(names, results))
 
-        # Merge the srcdir and destdir
-        merge_directories(destdir, srcdir)
+    for name, key in keys.items():
+        output = outputs[name]
 
-    # Remove temp confdir
-    if temp_confdir:
-        shutil.rmtree(confdir, ignore_errors=True)
+        # Some adjustments to the output
+        if output is None:
+            # TODO: Make this message configurable, so that it can be
+            # translated
+            outputs[name] = warning(
+                'It was not possible to get rich help for this object')
+            continue
+        output = output.replace('<pre>', '<pre class="literal-block">')
+        outputs[name] = output
+
+        # Output that refers to files from the build (e.g. plots) is only
+        # valid next to them, in srcdir. In memory they are inlined instead.
+        if '_images/' not in output:
+            render_cache.put(key, output, cache_dir)
 
     # Return contents
-    return output
+    return {name: outputs[name] for name in docstrings}
 
 
-def rich_repr(oinfo):
+@recorded
+def sphinxify_text(docstring, width=None, ansi=False):
     """
-    Generate a rich representation of an object's docstring and its metadata.
+    Render a docstring to plain text, for terminals and pagers.
 
-    These data are contained in an `oinfo` dict, as computed by the
-    IPython.core.oinspect library.
+    Unlike ``sphinxify(docstring, output_format='text')``, this doesn't run
+    Sphinx but renders the docstring with docutils alone (see `docrepr.text`),
+    which is fast enough to do on every ``obj?`` in an IPython shell.
 
     Parameters
     ----------
-    oinfo : dict
-        An object info dictionary
+    docstring : str
+        A reST-formatted docstring
+
+    width : int, optional
+        Maximum length of the lines. If None, the width of the terminal is
+        used.
+
+    ansi : bool
+        Whether to style the text with ANSI escape codes.
 
     Returns
     -------
-    The url of the page that contains the rich representation.
+    The docstring, as wrapped plain text.
     """
-    # Create srcdir
-    if not osp.isdir(CACHEDIR):
-        os.mkdir(CACHEDIR)
-    srcdir = tempfile.mkdtemp(dir=CACHEDIR)
-    srcdir = to_unicode_from_fs(srcdir)
-
-    output_file_path = osp.join(srcdir, 'rich_repr_output.html')
+    from .text import render_text
 
-    template_vars = init_template_vars(oinfo)
-
-    # Wrap docstring in Sphinx directive for appropriate processing
-    wrapped_docstring = wrap_main_docstring(oinfo)
+    if not docstring or docstring == '<no docstring>':
+        return 'No documentation available\n'
+    with stage('fast_path'):
+        return render_text(docstring, width, ansi)
 
-    # Sphinxified dsocstring contents
-    obj_doc = sphinxify(wrapped_docstring, srcdir)
-    template_vars['docstring'] = obj_doc
 
-    if oinfo.get('class_docstring'):
-        wrapped_class_docstring = wrap_class_docstring(oinfo)
-        class_doc = sphinxify(wrapped_class_docstring, srcdir)
-        template_vars['class_docstring'] = class_doc
-    else:
-        template_vars['class_docstring'] = ''
+def rich_repr_template_vars(oinfo):
+    """Generate the variables of the rich_repr template, except docstrings."""
+    template_vars = init_template_vars(oinfo)
 
     # Add link to docs.python.org
     # TODO: Make this really work (e.g. for the math module)
@@ -469,21 +899,619 @@ def rich_repr(oinfo):
     # highlight them using css, in a similar way to what IPython does.
     # NOTE: Before doing this, we escape common html chars so that they
     # don't interfere with the rest of html present in the page
-    argspec = escape(template_vars['argspec'])
+    argspec = escape(template_vars['argspec'], quote=False)
     for char in ['=', ',', '(', ')', '*', '**']:
         argspec = argspec.replace(char,
                          '<span class="argspec-highlight">' + char + '</span>')
     template_vars['argspec'] = argspec
 
+    return template_vars
+
+
+def rich_repr_cache_key(function, oinfo):
+    """
+    Compute the cache key of the page of an object rendered by `function`.
+
+    Memory addresses are left out, so that pages are found again in other
+    sessions (e.g. after being prerendered, see `docrepr.prerender`).
+    """
+    metadata = {}
+    for info_key in OINFO_KEYS:
+        value = oinfo.get(info_key)
+        if isinstance(value, str):
+            value = ADDRESS_RE.sub(' at 0x', value)
+        metadata[info_key] = value
+    return cache_key(function, metadata)
+
+
+def lookup_rich_reprs(oinfos):
+    """
+    Look up the cached pages of several objects.
+
+    Returns a dict with the pages found and a dict with the cache keys of
+    the objects that still need to be rendered.
+    """
+    cache_dir = render_cache_dir()
+    output_file_paths = {}
+    keys = {}
+    for name, oinfo in oinfos.items():
+        key = rich_repr_cache_key('rich_repr', oinfo)
+        with stage('cache'):
+            output_file_path = render_cache.get(key, cache_dir)
+            found = (output_file_path is not None
+                     and osp.isfile(output_file_path))
+        if found:
+            count('cache_hits')
+            touch(osp.dirname(output_file_path))
+            output_file_paths[name] = output_file_path
+        else:
+            count('cache_misses')
+            keys[name] = key
+    return output_file_paths, keys
+
+
+def _page_oinfo(oinfo):
+    """
+    Return the keys of `oinfo` its page depends on.
+
+    The other keys may hold arbitrary objects, so only these are sent to
+    other processes, where they're serialized.
+    """
+    return {info_key: oinfo.get(info_key) for info_key in OINFO_KEYS}
+
+
+def render_on_server(function, oinfos):
+    """
+    Render object info dicts with the render server, if one is running.
+
+    See `docrepr.server`. Returns the list of outputs of `function` for each
+    object info dict, or None if they must be rendered in-process.
+    """
+    if (not options['render_server']
+            or not osp.isfile(osp.join(CACHEDIR, SERVER_FILENAME))):
+        return None
+    from .server import request_render
+
+    pending = [_page_oinfo(oinfo) for oinfo in oinfos]
+    with stage('server'):
+        return request_render(CACHEDIR, function, pending)
+
+
+def render_rich_reprs(oinfos, srcdir=None):
+    """
+    Render the rich representation pages of several objects.
+
+    Build output is placed in `srcdir`, or kept in memory if it's None (see
+    `sphinxify`). Returns a dict with the HTML of each page.
+    """
+    # Class docstrings are either built along with the main ones or, to
+    # not wait for both, in a background process at the same time
+    concurrent = options['concurrent_class_docstring']
+
+    # Wrap docstrings in Sphinx directives for appropriate processing
+    docstrings = {}
+    class_docstrings = {}
+    with stage('wrap'):
+        for name, oinfo in oinfos.items():
+            docstrings[name, 'docstring'] = wrap_main_docstring(oinfo)
+            if oinfo.get('class_docstring'):
+                target = class_docstrings if concurrent else docstrings
+                target[name, 'class_docstring'] = wrap_class_docstring(oinfo)
+
+    # Sphinxified docstring contents
+    if class_docstrings:
+        class_docs = sphinxify_in_background(
+            list(class_docstrings.values()), srcdir)
+    docs = sphinxify_many(docstrings, srcdir)
+    if class_docstrings:
+        with stage('background'):
+            docs.update(zip(class_docstrings, class_docs.get()))
+
+    return {
+        name: render_rich_repr_page(
+            oinfo, docs[name, 'docstring'],
+            docs.get((name, 'class_docstring'), ''))
+        for name, oinfo in oinfos.items()
+        }
+
+
+def render_rich_repr_page(oinfo, docstring, class_docstring):
+    """Render the rich representation page of an object from its docs."""
+    template_vars = rich_repr_template_vars(oinfo)
+    template_vars['docstring'] = docstring
+    template_vars['class_docstring'] = class_docstring
+
     # Replace vars on the template
-    env = Environment()
-    env.loader = FileSystemLoader(osp.join(CONFDIR_PATH, 'templates'))
-    page = env.get_template('rich_repr.html')
-    output = page.render(**template_vars)
+    with stage('template'):
+        env = template_environment()
+        page = env.get_template('rich_repr.html')
+        return page.render(**template_vars)
+
+
+def write_page(output_file_path, html):
+    """
+    Write a page to disk.
+
+    The file is replaced atomically, so a page can be rewritten while it's
+    displayed.
+    """
+    temp_file_path = output_file_path + '.tmp'
+    with stage('write'):
+        with open(temp_file_path, 'w', encoding='utf-8') as output_file:
+            output_file.write(html)
+        os.replace(temp_file_path, output_file_path)
+    count('bytes_written', osp.getsize(output_file_path))
+
+
+@recorded
+def rich_repr(oinfo):
+    """
+    Generate a rich representation of an object's docstring and its metadata.
+
+    These data are contained in an `oinfo` dict, as computed by the
+    IPython.core.oinspect library. Pages are cached, so repeated calls with
+    the same object info and options return the same page.
+
+    Parameters
+    ----------
+    oinfo : dict
+        An object info dictionary
+
+    Returns
+    -------
+    The url of the page that contains the rich representation.
+    """
+    return rich_repr_many({0: oinfo})[0]
+
+
+@recorded
+def rich_repr_many(oinfos):
+    """
+    Generate the rich representations of several objects at once.
+
+    This is equivalent to calling `rich_repr` on each object info dict, but
+    all the docstrings are processed together (see `sphinxify_many`).
+
+    Parameters
+    ----------
+    oinfos : dict
+        Object info dictionaries, by any hashable key
+
+    Returns
+    -------
+    A dict with the url of the page of each object, under the same keys as
+    `oinfos`.
+    """
+    output_file_paths, keys = lookup_rich_reprs(oinfos)
+
+    # Let the render server render the missing pages, if one is running
+    results = None
+    if keys:
+        results = render_on_server(
+            'rich_repr_many', [oinfos[name] for name in keys])
+
+    if results is not None:
+        cache_dir = render_cache_dir()
+        for (name, key), output_file_path in zip(keys.items(), results):
+            render_cache.put(key, output_file_path, cache_dir)
+            output_file_paths[name] = output_file_path
+    elif keys:
+        # Create srcdir
+        srcdir = make_render_dir(CACHEDIR)
+        srcdir = to_unicode_from_fs(srcdir)
+
+        pages = render_rich_reprs(
+            {name: oinfos[name] for name in keys}, srcdir)
+        cache_dir = render_cache_dir()
+
+        for index, (name, key) in enumerate(keys.items()):
+            # Rewrite output contents after adjustments
+            if index:
+                page_name = 'rich_repr_output-%d.html' % index
+            else:
+                page_name = 'rich_repr_output.html'
+            output_file_path = osp.join(srcdir, page_name)
+            write_page(output_file_path, pages[name])
+            render_cache.put(key, output_file_path, cache_dir)
+            output_file_paths[name] = output_file_path
+
+    # Return output file paths
+    return {name: output_file_paths[name] for name in oinfos}
+
+
+@recorded
+def rich_repr_html(oinfo):
+    """
+    Generate the rich representation of an object as an HTML string.
+
+    This is like `rich_repr`, but the page is rendered in memory and
+    returned instead of written to disk, with the images it contains
+    inlined. No temporary files are created (see `sphinxify`).
+
+    Parameters
+    ----------
+    oinfo : dict
+        An object info dictionary
+
+    Returns
+    -------
+    The HTML of the page that contains the rich representation.
+    """
+    key = rich_repr_cache_key('rich_repr_html', oinfo)
+    cache_dir = render_cache_dir()
+    with stage('cache'):
+        output = render_cache.get(key, cache_dir)
+    if output is not None:
+        count('cache_hits')
+        return output
+
+    count('cache_misses')
+    outputs = render_on_server('rich_repr_html', [oinfo])
+    if outputs is not None:
+        output, = outputs
+    else:
+        output = render_rich_reprs({0: oinfo})[0]
+    render_cache.put(key, output, cache_dir)
+    return output
+
+
+def rich_repr_progressive(oinfo):
+    """
+    Generate the rich representation of an object progressively.
+
+    Instead of waiting for the whole page to be rendered, like `rich_repr`
+    does, this yields its url as soon as the main docstring is rendered,
+    and again each time the page is rewritten with more content: first
+    with the plots of the main docstring, whose source code is shown until
+    then, and then with the class docstring, whose tab shows a message
+    until then. The page is replaced atomically, so it can be reloaded at
+    any time.
+
+    Each step is reported separately to the observers of the render stats
+    (see `add_observer`).
+
+    Parameters
+    ----------
+    oinfo : dict
+        An object info dictionary
+
+    Yields
+    ------
+    The url of the page that contains the rich representation, each time
+    it's updated. Once the last one is yielded the page is complete and
+    cached, as if it was generated by `rich_repr`.
+    """
+    with record('rich_repr_progressive'):
+        output_file_paths, keys = lookup_rich_reprs({0: oinfo})
+    if output_file_paths:
+        yield output_file_paths[0]
+        return
+
+    srcdir = to_unicode_from_fs(make_render_dir(CACHEDIR))
+    output_file_path = osp.join(srcdir, 'rich_repr_output.html')
+    docstring = wrap_main_docstring(oinfo)
+    has_plots = bool(docstring) and bool(
+        EXTENSION_MARKUP_RE['matplotlib.sphinxext.plot_directive'].search(
+            docstring))
+    class_docstring = ''
+    if oinfo.get('class_docstring'):
+        class_docstring = wrap_class_docstring(oinfo)
+
+    # Each step renders a part of the page, or a better version of it
+    steps = []
+    if has_plots:
+        steps.append(('docstring', plot_sources(docstring)))
+    steps.append(('docstring', docstring))
+    if class_docstring:
+        steps.append(('class_docstring', class_docstring))
+
+    # TODO: Make this message configurable, so that it can be translated
+    docs = {
+        'docstring': '',
+        'class_docstring': warning('Rendering...') if class_docstring else '',
+        }
+    for index, (part, step_docstring) in enumerate(steps):
+        with record('rich_repr_progressive'):
+            docs[part] = sphinxify(step_docstring, srcdir)
+            write_page(
+                output_file_path,
+                render_rich_repr_page(
+                    oinfo, docs['docstring'], docs['class_docstring']))
+        if index == len(steps) - 1:
+            render_cache.put(keys[0], output_file_path, render_cache_dir())
+        yield output_file_path
 
-    # Rewrite output contents after adjustments
-    with open(output_file_path, 'w', encoding='utf-8') as output_file:
-        output_file.write(output)
 
-    # Return output file path
-    return output_file_path
+#-----------------------------------------------------------------------------
+# Asyncio API
+#-----------------------------------------------------------------------------
+async def sphinxify_async(docstring, srcdir=None, output_format='html',
+                          temp_confdir=False, executor=None):
+    """
+    Run `sphinxify` without blocking the event loop.
+
+    The build runs in `executor` (the loop's default executor if None).
+    Cancelling the call returns control right away, but a build that has
+    already started runs to completion in the background.
+    """
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(
+            sphinxify, docstring, srcdir, output_format, temp_confdir),
+        )
+
+
+async def rich_repr_async(oinfo, executor=None):
+    """
+    Run `rich_repr` without blocking the event loop.
+
+    See `sphinxify_async` for the details.
+    """
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, rich_repr, oinfo)
+
+
+class _PaneState:
+    """Requests made for a pane of a `RenderCoalescer`."""
+
+    def __init__(self):
+        import asyncio
+
+        self.generation = 0
+        self.lock = asyncio.Lock()
+
+
+class RenderCoalescer:
+    """
+    Render help for panes where only the latest request matters.
+
+    An editor asks for help every time the cursor moves, much faster than
+    pages can be rendered. With a coalescer, each pane has at most one
+    render in flight; a request waits for it to finish, and is dropped if a
+    newer request for the same pane arrives in the meantime. Renders whose
+    result arrives after a newer request was made are discarded too.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor, optional
+        Executor to run the renders in. Defaults to the loop's default
+        executor.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self._panes = {}
+
+    async def _render(self, pane, func, *args):
+        import asyncio
+
+        state = self._panes.setdefault(pane, _PaneState())
+        state.generation += 1
+        generation = state.generation
+
+        async with state.lock:
+            if generation != state.generation:
+                return None
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                self.executor, functools.partial(func, *args))
+
+        if generation != state.generation:
+            return None
+        return result
+
+    def cancel(self, pane=None):
+        """Drop the pending and in-flight requests of `pane`."""
+        state = self._panes.get(pane)
+        if state is not None:
+            state.generation += 1
+
+    async def sphinxify(self, docstring, srcdir=None, output_format='html',
+                        temp_confdir=False, pane=None):
+        """
+        Run `sphinxify` for `pane`, unless a newer request supersedes it.
+
+        Returns None if the request was superseded or cancelled.
+        """
+        return await self._render(
+            pane, sphinxify, docstring, srcdir, output_format, temp_confdir)
+
+    async def rich_repr(self, oinfo, pane=None):
+        """
+        Run `rich_repr` for `pane`, unless a newer request supersedes it.
+
+        Returns None if the request was superseded or cancelled.
+        """
+        return await self._render(pane, rich_repr, oinfo)
+
+
+#-----------------------------------------------------------------------------
+# Parallel rendering
+#-----------------------------------------------------------------------------
+def _init_worker():
+    """Clean up the renderers of a worker process when it exits."""
+    import multiprocessing.util
+
+    multiprocessing.util.Finalize(None, reset_renderers, exitpriority=10)
+
+
+def _render_chunk(args):
+    """Render a chunk of object info dicts in a worker process."""
+    global CACHEDIR
+    worker_options, cachedir, oinfos = args
+    # Workers can't start processes of their own, and render their chunks
+    # themselves rather than one by one on the server
+    options.update(worker_options, concurrent_class_docstring=False,
+                   render_server=False)
+    CACHEDIR = cachedir
+    output_file_paths = rich_repr_many(dict(enumerate(oinfos)))
+    return [output_file_paths[index] for index in range(len(oinfos))]
+
+
+def _sphinxify_docstrings(args):
+    """Run `sphinxify_many` on a list of docstrings in a worker process."""
+    global CACHEDIR
+    worker_options, cachedir, docstrings, srcdir = args
+    options.update(worker_options, concurrent_class_docstring=False,
+                   render_server=False)
+    CACHEDIR = cachedir
+    outputs = sphinxify_many(dict(enumerate(docstrings)), srcdir)
+    return [outputs[index] for index in range(len(docstrings))]
+
+
+def sphinxify_in_background(docstrings, srcdir=None):
+    """
+    Start running `sphinxify` on a list of docstrings in another process.
+
+    The process is started on the first call and kept around, so that its
+    renderers are reused by later calls. Since Sphinx builds are CPU-bound,
+    this is the only way to build docstrings at the same time as others.
+
+    Parameters
+    ----------
+    docstrings : list of str
+        reST-formatted docstrings
+
+    srcdir : str, optional
+        Directory where the build output is placed (see `sphinxify`).
+
+    Returns
+    -------
+    A `multiprocessing.pool.AsyncResult`, whose ``get`` method waits for
+    the build and returns the list of outputs of the docstrings.
+    """
+    global _background_pool, _background_pool_pid
+    import multiprocessing
+
+    # Pools inherited from a parent process can't be used
+    if _background_pool is None or _background_pool_pid != os.getpid():
+        _background_pool = multiprocessing.Pool(1, initializer=_init_worker)
+        _background_pool_pid = os.getpid()
+        atexit.register(_background_pool.terminate)
+    return _background_pool.apply_async(
+        _sphinxify_docstrings,
+        [(dict(options), CACHEDIR, docstrings, srcdir)],
+        )
+
+
+class RenderPool:
+    """
+    Pool of worker processes to render many objects in parallel.
+
+    Sphinx builds are CPU-bound, so large sets of objects render much faster
+    spread over several processes. Each worker has its own renderers and
+    render directories under `CACHEDIR`, and is replaced by a fresh one after
+    a number of renders to cap its memory usage. The docrepr options in
+    effect when calling `rich_repr_many` are used by the workers.
+
+    Parameters
+    ----------
+    processes : int, optional
+        Number of worker processes. Defaults to the `render_processes`
+        option, or the number of CPUs if that is None.
+
+    max_renders : int, optional
+        Number of objects a worker renders before being replaced. Defaults to
+        the `max_renders_per_process` option; None means never.
+
+    chunksize : int, optional
+        Maximum number of objects sent to a worker at once.
+    """
+
+    def __init__(self, processes=None, max_renders=None,
+                 chunksize=RENDER_CHUNKSIZE):
+        if processes is None:
+            processes = options['render_processes'] or os.cpu_count() or 1
+        if max_renders is None:
+            max_renders = options['max_renders_per_process']
+        import multiprocessing
+
+        self.processes = processes
+        self.chunksize = chunksize
+
+        maxtasksperchild = None
+        if max_renders:
+            maxtasksperchild = max(1, max_renders // chunksize)
+        self._pool = multiprocessing.Pool(
+            processes,
+            initializer=_init_worker,
+            maxtasksperchild=maxtasksperchild,
+            )
+
+    def rich_repr_many(self, oinfos):
+        """
+        Generate the rich representations of several objects in parallel.
+
+        See `docrepr.sphinxify.rich_repr_many` for the parameters and
+        return value.
+        """
+        output_file_paths, keys = lookup_rich_reprs(oinfos)
+        if keys:
+            names = list(keys)
+            pending = [_page_oinfo(oinfos[name]) for name in names]
+            size = max(1, min(self.chunksize,
+                              math.ceil(len(pending) / self.processes)))
+            chunks = [
+                (dict(options), CACHEDIR, pending[start:start + size])
+                for start in range(0, len(pending), size)
+                ]
+
+            results = []
+            for chunk_results in self._pool.imap(_render_chunk, chunks):
+                results.extend(chunk_results)
+
+            cache_dir = render_cache_dir()
+            for name, output_file_path in zip(names, results):
+                render_cache.put(keys[name], output_file_path, cache_dir)
+                output_file_paths[name] = output_file_path
+
+        return {name: output_file_paths[name] for name in oinfos}
+
+    def close(self):
+        """Wait for the workers to finish and stop them."""
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """Stop the workers immediately."""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+
+def rich_repr_parallel(oinfos, processes=None):
+    """
+    Generate the rich representations of several objects in parallel.
+
+    This is a shortcut for `RenderPool.rich_repr_many` with a temporary
+    pool. Keep a `RenderPool` around instead to render several sets of
+    objects, since starting the workers and their renderers takes a while.
+
+    Parameters
+    ----------
+    oinfos : dict
+        Object info dictionaries, by any hashable key
+
+    processes : int, optional
+        Number of worker processes (see `RenderPool`).
+
+    Returns
+    -------
+    A dict with the url of the page of each object, under the same keys as
+    `oinfos`, in the same order.
+    """
+    with RenderPool(processes) as pool:
+        return pool.rich_repr_many(oinfos)
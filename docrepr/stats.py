@@ -0,0 +1,174 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Instrumentation of the render pipeline.
+
+Observers registered with `add_observer` are called with a `RenderStats`
+object after each top-level `sphinxify` or `rich_repr` call (or their
+variants) completes. Stats are only recorded while there is at least one
+observer, and recording only takes a couple of clock reads per stage, so
+observers can be left registered in production.
+"""
+
+# Stdlib imports
+import contextlib
+import functools
+import threading
+import time
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+# Callbacks called with the stats of every render call
+_observers = []
+
+# Stats of the call being recorded in each thread
+_local = threading.local()
+
+
+#-----------------------------------------------------------------------------
+# Stats
+#-----------------------------------------------------------------------------
+class RenderStats:
+    """
+    Statistics of a single render call.
+
+    Attributes
+    ----------
+    function : str
+        Name of the function that was called, e.g. ``'rich_repr'``.
+
+    duration : float
+        Total duration of the call, in seconds.
+
+    stages : dict
+        Time spent in each stage of the pipeline, in seconds. Stages that
+        run several times in the call (e.g. once per docstring) are added
+        up. Possible stages are ``wrap`` (wrapping docstrings in Sphinx
+        directives), ``cache`` (cache lookups), ``fast_path`` (rendering
+        with docutils), ``create_app`` (creating a Sphinx application),
+        ``build`` (building with Sphinx), ``read_output`` (reading the
+        build output), ``place_output`` (linking images and static files
+        into the output dir), ``server`` (rendering with the render server,
+        see `docrepr.server`), ``background`` (waiting for docstrings built
+        in another process), ``template`` (rendering Jinja templates) and
+        ``write`` (writing pages).
+
+    cache_hits, cache_misses : int
+        Number of rendered docstrings and pages found and not found in the
+        render cache.
+
+    bytes_written : int
+        Size of the pages and cache entries written to disk.
+
+    extensions : list of list of str
+        Sphinx extensions used by each build of the call.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.duration = 0.0
+        self.stages = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_written = 0
+        self.extensions = []
+
+    def __repr__(self):
+        stages = ', '.join(
+            '%s=%.1fms' % (name, 1000 * duration)
+            for name, duration in self.stages.items())
+        return ('<RenderStats %s: %.1fms (%s), %d cache hits, '
+                '%d cache misses, %d bytes written>' % (
+                    self.function, 1000 * self.duration, stages,
+                    self.cache_hits, self.cache_misses, self.bytes_written))
+
+
+#-----------------------------------------------------------------------------
+# Observers
+#-----------------------------------------------------------------------------
+def add_observer(callback):
+    """
+    Call `callback` with the `RenderStats` of every render call.
+
+    Callbacks run in the thread that made the call, right before it
+    returns. Calls that raise an exception are not reported.
+    """
+    if callback not in _observers:
+        _observers.append(callback)
+
+
+def remove_observer(callback):
+    """Stop calling a callback registered with `add_observer`."""
+    try:
+        _observers.remove(callback)
+    except ValueError:
+        pass
+
+
+#-----------------------------------------------------------------------------
+# Recording
+#-----------------------------------------------------------------------------
+def current_stats():
+    """Return the stats of the call being recorded in this thread, if any."""
+    return getattr(_local, 'stats', None)
+
+
+@contextlib.contextmanager
+def record(function):
+    """
+    Record the stats of a render call made to `function`.
+
+    Calls made while another one is recorded in the same thread (e.g. to
+    `sphinxify_many` from `sphinxify`) count towards the outer call.
+    """
+    if not _observers or current_stats() is not None:
+        yield
+        return
+
+    stats = RenderStats(function)
+    _local.stats = stats
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.duration = time.perf_counter() - start
+        _local.stats = None
+
+    for callback in list(_observers):
+        callback(stats)
+
+
+def recorded(func):
+    """Decorator that records the stats of the calls made to `func`."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with record(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Add the time spent in the block to stage `name` of the current call."""
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.stages[name] = (
+            stats.stages.get(name, 0.0) + time.perf_counter() - start)
+
+
+def count(attribute, value=1):
+    """Add `value` to a counter of the current call, e.g. `cache_hits`."""
+    stats = current_stats()
+    if stats is not None:
+        setattr(stats, attribute, getattr(stats, attribute) + value)
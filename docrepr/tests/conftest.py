@@ -0,0 +1,34 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Fixtures shared by docrepr's tests."""
+
+# Third party imports
+import pytest
+
+# Local imports
+import docrepr.sphinxify
+from docrepr.cache import render_cache
+
+
+# ---- Fixtures
+
+@pytest.fixture(name='cachedir')
+def fixture_cachedir(tmp_path, monkeypatch):
+    """Render in a temporary cache directory, with an empty render cache."""
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    render_cache.clear()
+    yield tmp_path
+    render_cache.clear()
+
+
+@pytest.fixture(name='reports')
+def fixture_reports():
+    """Collect the stats of every render call, starting with no cache."""
+    reports = []
+    render_cache.clear()
+    docrepr.sphinxify.add_observer(reports.append)
+    yield reports
+    docrepr.sphinxify.remove_observer(reports.append)
+    render_cache.clear()
@@ -0,0 +1,177 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for docrepr's render cache and cache directory."""
+
+# Standard library imports
+import copy
+import os
+import time
+from pathlib import Path
+
+# Third party imports
+import pytest
+
+# Local imports
+import docrepr
+import docrepr.renderer
+import docrepr.sphinxify
+from docrepr.cache import (PLOT_CACHE_DIRNAME, PRUNE_LOCK, PRUNE_STAMP,
+                           RENDER_CACHE_DIRNAME, RENDERER_PREFIX,
+                           TEMPLATE_CACHE_DIRNAME, prune_cachedir,
+                           publish_dir, render_cache)
+
+
+# ---- Fixtures
+
+@pytest.fixture(name='cache_setup')
+def fixture_cache_setup(tmp_path, monkeypatch):
+    """Use a fresh cache, with its disk tier under a temp dir."""
+    default_options = copy.deepcopy(docrepr.options)
+    # Make every render go through the renderers, so they can be counted
+    docrepr.options['docutils_fast_path'] = False
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    render_cache.clear()
+    yield tmp_path
+    render_cache.clear()
+    docrepr.options.clear()
+    docrepr.options.update(default_options)
+
+
+@pytest.fixture(name='count_renders')
+def fixture_count_renders(monkeypatch):
+    """Count the docstrings that actually go through Sphinx."""
+    rendered = []
+    original_render_many = docrepr.renderer.Renderer.render_many
+
+    def _render_many(self, docstrings, *args, **kwargs):
+        rendered.extend(docstrings)
+        return original_render_many(self, docstrings, *args, **kwargs)
+
+    monkeypatch.setattr(
+        docrepr.renderer.Renderer, 'render_many', _render_many)
+    return rendered
+
+
+# ---- Tests
+
+def test_sphinxify_cached(cache_setup, count_renders):
+    """Test that identical docstrings are only rendered once."""
+    srcdir = str(cache_setup)
+    first = docrepr.sphinxify.sphinxify('A *cached* docstring', srcdir)
+    second = docrepr.sphinxify.sphinxify('A *cached* docstring', srcdir)
+    assert first == second
+    assert len(count_renders) == 1
+
+    docrepr.sphinxify.sphinxify('A *cached* docstring', srcdir, 'text')
+    docrepr.options['render_math'] = False
+    docrepr.sphinxify.sphinxify('A *cached* docstring', srcdir)
+    assert len(count_renders) == 3
+
+
+def test_rich_repr_cached(cache_setup, count_renders):
+    """Test that rich_repr returns the cached page for the same oinfo."""
+    oinfo = {'name': 'foo', 'docstring': 'Some docstring', 'type_name': None}
+    url = docrepr.sphinxify.rich_repr(oinfo)
+    assert docrepr.sphinxify.rich_repr(dict(oinfo)) == url
+    assert len(count_renders) == 1
+
+    # Pages that were removed are generated again
+    Path(url).unlink()
+    new_url = docrepr.sphinxify.rich_repr(oinfo)
+    assert new_url != url
+    assert Path(new_url).is_file()
+
+
+def test_disk_cache(cache_setup, count_renders):
+    """Test that the disk tier survives clearing the memory tier."""
+    docrepr.options['disk_cache'] = True
+    oinfo = {'name': 'foo', 'docstring': 'Some docstring', 'type_name': None}
+    url = docrepr.sphinxify.rich_repr(oinfo)
+    assert (cache_setup / 'render-cache').is_dir()
+
+    render_cache.clear()
+    assert docrepr.sphinxify.rich_repr(oinfo) == url
+    assert len(count_renders) == 1
+
+
+def test_prune_cachedir(tmp_path):
+    """Test that the least recently used entries are evicted first."""
+    now = time.time()
+    for index, name in enumerate(['oldest', 'older', 'recent']):
+        entry = tmp_path / name
+        entry.mkdir()
+        (entry / 'page.html').write_bytes(b'x' * 1000)
+        last_used = now - 3600 * (3 - index)
+        os.utime(entry, (last_used, last_used))
+    renderer_dir = tmp_path / (RENDERER_PREFIX + 'abc')
+    renderer_dir.mkdir()
+    (renderer_dir / 'big').write_bytes(b'x' * 10000)
+    os.utime(renderer_dir, (now - 7200, now - 7200))
+
+    freed = prune_cachedir(str(tmp_path), max_size=2500, max_age=None)
+    assert freed == 1000
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        PRUNE_STAMP, 'older', 'recent', renderer_dir.name]
+
+    prune_cachedir(str(tmp_path), max_size=None, max_age=5000)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        PRUNE_STAMP, 'recent']
+
+
+def test_prune_plot_cache(tmp_path):
+    """Test that plot cache entries are evicted one by one."""
+    now = time.time()
+    bucket_dir = tmp_path / PLOT_CACHE_DIRNAME / 'ab'
+    for index, name in enumerate(['ab01', 'ab02']):
+        entry = bucket_dir / name
+        entry.mkdir(parents=True)
+        (entry / 'image.png').write_bytes(b'x' * 1000)
+        last_used = now - 7200 * (1 - index)
+        os.utime(entry, (last_used, last_used))
+
+    prune_cachedir(str(tmp_path), max_size=None, max_age=5000)
+    assert [path.name for path in bucket_dir.iterdir()] == ['ab02']
+
+
+def test_prune_cachedir_locked(tmp_path):
+    """Test that only one process prunes the cache dir at a time."""
+    entry = tmp_path / 'old'
+    entry.mkdir()
+    os.utime(entry, (0, 0))
+    (tmp_path / PRUNE_LOCK).touch()
+    assert prune_cachedir(str(tmp_path), max_age=1) == 0
+    assert entry.exists()
+
+
+def test_publish_dir(tmp_path):
+    """Test that a dir is only published once, and complete."""
+    path = tmp_path / 'entry'
+    publish_dir(str(path), lambda temp_dir: Path(temp_dir, 'a').touch())
+    publish_dir(str(path), lambda temp_dir: Path(temp_dir, 'b').touch())
+    assert [child.name for child in path.iterdir()] == ['a']
+    assert [child.name for child in tmp_path.iterdir()] == ['entry']
+
+
+def test_purge_cache(cache_setup):
+    """Test that purging removes every render from memory and disk."""
+    docrepr.options['disk_cache'] = True
+    oinfo = {'name': 'foo', 'docstring': 'Some docstring', 'type_name': None}
+    url = docrepr.sphinxify.rich_repr(oinfo)
+
+    docrepr.sphinxify.purge_cache()
+    assert not Path(url).exists()
+    assert not (cache_setup / RENDER_CACHE_DIRNAME).exists()
+    assert not docrepr.renderer._renderers
+    assert Path(docrepr.sphinxify.rich_repr(oinfo)).is_file()
+
+
+def test_template_bytecode_cache(cache_setup):
+    """Test that compiled templates can be stored in the cache dir."""
+    assert (docrepr.sphinxify.template_environment()
+            is docrepr.sphinxify.template_environment())
+
+    docrepr.options['template_bytecode_cache'] = True
+    docrepr.sphinxify.warning('A warning')
+    assert list((cache_setup / TEMPLATE_CACHE_DIRNAME).iterdir())
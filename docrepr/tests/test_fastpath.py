@@ -0,0 +1,87 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for the docutils-only rendering of simple docstrings."""
+
+# Standard library imports
+import re
+
+# Third party imports
+import pytest
+
+# Local imports
+import docrepr
+import docrepr.sphinxify
+from docrepr.cache import render_cache
+from docrepr.fastpath import render_html
+
+
+# ---- Test data
+
+SIMPLE_DOCSTRINGS = {
+    'plain': 'A test',
+    'inline': ('Some *emphasis*, **strong** text and ``literal  code``.\n'
+               'A second line with "quotes" -- and a dash.'),
+    'numpydoc': """
+Trigonometric sine, element-wise.
+
+Parameters
+----------
+x : array_like
+    Angle, in radians.
+out : ndarray, optional
+    A location into which the result is stored.
+
+Notes
+-----
+- An item
+- Another item
+
+    An indented quote, see https://www.python.org.
+""",
+    }
+
+SPHINX_DOCSTRINGS = {
+    'role': 'See :func:`print`.',
+    'directive': 'Text\n\n.. versionadded:: 1.0\n',
+    'doctest': 'Example\n\n>>> 1 + 1\n2\n',
+    'literal_block': 'Example::\n\n    code()\n',
+    'default_role': 'Uses `default role`.',
+    'table': '=====  =====\nA      B\n=====  =====\n1      2\n=====  =====\n',
+    'warning': 'Long title\n====\n\nUnderline too short.',
+    }
+
+
+# ---- Helper functions
+
+def _normalize(html):
+    """Collapse the whitespace between block elements."""
+    return re.sub(r'\s+', ' ', html.replace('</dt>\n<dd>', '</dt><dd>'))
+
+
+# ---- Tests
+
+@pytest.mark.parametrize(
+    'docstring', SIMPLE_DOCSTRINGS.values(), ids=SIMPLE_DOCSTRINGS.keys())
+def test_same_as_sphinx(tmp_path, docstring):
+    """Test that simple docstrings are rendered just like Sphinx does."""
+    fast_path = docrepr.options['docutils_fast_path']
+    render_cache.clear()
+    try:
+        docrepr.options['docutils_fast_path'] = False
+        expected = docrepr.sphinxify.sphinxify(docstring, str(tmp_path))
+    finally:
+        docrepr.options['docutils_fast_path'] = fast_path
+        render_cache.clear()
+
+    body = render_html(docstring)
+    assert body is not None
+    assert _normalize(body) in _normalize(expected)
+
+
+@pytest.mark.parametrize(
+    'docstring', SPHINX_DOCSTRINGS.values(), ids=SPHINX_DOCSTRINGS.keys())
+def test_needs_sphinx(docstring):
+    """Test that docstrings with Sphinx-specific markup are left to Sphinx."""
+    assert render_html(docstring) is None
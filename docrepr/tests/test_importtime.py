@@ -0,0 +1,76 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests that importing docrepr stays fast."""
+
+# Standard library imports
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# Third party imports
+import pytest
+
+
+# ---- Test data
+
+# Maximum cumulative import time of each module, in microseconds. These are
+# generous, since importing Sphinx alone takes several times longer.
+IMPORT_BUDGETS = {
+    'docrepr': 50000,
+    'docrepr.sphinxify': 150000,
+    }
+
+# Packages that must only be imported when something is rendered
+HEAVY_MODULES = [
+    'asyncio', 'docutils', 'jinja2', 'matplotlib', 'multiprocessing',
+    'sphinx',
+    ]
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$')
+
+
+# ---- Helper functions
+
+def _run_python(code, *args):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(Path(__file__).parents[2]), env.get('PYTHONPATH', '')])
+    return subprocess.run(
+        [sys.executable, *args, '-c', code], env=env, check=True,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+
+
+def _cumulative_import_time(module):
+    """Import `module` in a fresh interpreter and return its import time."""
+    result = _run_python('import ' + module, '-X', 'importtime')
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match and not match.group(2) and match.group(3) == module:
+            return int(match.group(1))
+    raise AssertionError('No import time reported for ' + module)
+
+
+# ---- Tests
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='-X importtime requires Python 3.7+')
+@pytest.mark.parametrize('module', list(IMPORT_BUDGETS))
+def test_import_time(module):
+    """Test that importing docrepr modules stays under a time budget."""
+    # Take the best of a few runs, to reduce noise
+    import_time = min(_cumulative_import_time(module) for __ in range(3))
+    assert import_time < IMPORT_BUDGETS[module]
+
+
+def test_no_heavy_imports():
+    """Test that importing docrepr doesn't import its heavy dependencies."""
+    result = _run_python(
+        'import sys, docrepr.sphinxify; '
+        'print(" ".join(sorted(sys.modules)))')
+    imported = {name.split('.')[0] for name in result.stdout.split()}
+    assert not imported.intersection(HEAVY_MODULES)
@@ -19,6 +19,7 @@
 # Local imports
 import docrepr
 import docrepr.sphinxify
+from docrepr.cache import render_cache
 
 
 # ---- Test data
@@ -248,3 +249,89 @@ async def test_sphinxify(
 
     await compare_screenshots(test_id, url)
     open_browser(url)
+
+
+@pytest.mark.parametrize(
+    ('docrepr_options', 'included', 'excluded'),
+    [
+        ({'legacy_assets': False},
+         ['base.css', 'docrepr.js'], ['jquery.js', 'bootstrap']),
+        ({},
+         ['bootstrap.css', 'jquery.js', 'bootstrap.js', 'copy_button.js'],
+         ['base.css', 'docrepr.js']),
+        ({'inline_assets': True},
+         ['<style type="text/css">', 'data:image/png;base64,'],
+         ['.css"', '.js"']),
+        ],
+    ids=['slim', 'legacy', 'inline'],
+    )
+def test_page_assets(build_oinfo, set_docrepr_options,
+                     docrepr_options, included, excluded):
+    """Test the assets loaded by rich_repr pages in each asset mode."""
+    set_docrepr_options(collapse_sections=True, **docrepr_options)
+    oinfo = build_oinfo(np.sin, name='sin')
+    url = docrepr.sphinxify.rich_repr(oinfo)
+    file_text = Path(url).read_text(encoding='utf-8')
+    for text in included:
+        assert text in file_text
+    for text in excluded:
+        assert text not in file_text
+
+
+def test_rich_repr_progressive(build_oinfo, set_docrepr_options):
+    """Test that progressive pages are filled in step by step."""
+    set_docrepr_options(disk_cache=False)
+    render_cache.clear()
+    oinfo = build_oinfo(
+        name='Foo', docstring=PLOT_DOCSTRING,
+        class_docstring='A *class* docstring')
+
+    urls = []
+    pages = []
+    for url in docrepr.sphinxify.rich_repr_progressive(oinfo):
+        urls.append(url)
+        pages.append(Path(url).read_text(encoding='utf-8'))
+
+    # Plot source, then plot, then class docstring
+    assert len(set(urls)) == 1
+    assert len(pages) == 3
+    assert 'highlight-python' in pages[0] and '<img' not in pages[0]
+    assert '<img' in pages[1] and 'Rendering...' in pages[1]
+    assert '<em>class</em>' in pages[2] and 'Rendering...' not in pages[2]
+
+    # The complete page is cached
+    assert list(docrepr.sphinxify.rich_repr_progressive(oinfo)) == urls[:1]
+    assert docrepr.sphinxify.rich_repr(oinfo) == urls[0]
+
+
+def test_concurrent_class_docstring(build_oinfo, set_docrepr_options):
+    """Test that class docstrings rendered in the background are the same."""
+    set_docrepr_options(disk_cache=False)
+    render_cache.clear()
+    oinfo = build_oinfo(
+        name='Foo', docstring='Foo :math:`x^2` docstring',
+        class_docstring='A *class* docstring')
+    expected = docrepr.sphinxify.rich_repr_html(oinfo)
+
+    set_docrepr_options(concurrent_class_docstring=True)
+    render_cache.clear()
+    assert docrepr.sphinxify.rich_repr_html(oinfo) == expected
+    assert '<em>class</em>' in expected
+
+
+def test_mathml(build_oinfo, set_docrepr_options):
+    """Test that math is converted to MathML instead of loading MathJax."""
+    set_docrepr_options(mathml=True)
+    oinfo = build_oinfo(
+        name='Foo',
+        docstring=('Math :math:`a^2 = b^2 + c^2` and :math:`\\unknown{x}`'
+                   ', :math:`a & b`, :math:`a \\\\ b`'
+                   '\n\n.. math::\n\n   \\frac{x}{y}\n'))
+    url = docrepr.sphinxify.rich_repr(oinfo)
+    file_text = Path(url).read_text(encoding='utf-8')
+    assert file_text.count('<math xmlns') == 2
+    assert 'display="block"' in file_text
+    assert '\\unknown{x}' in file_text
+    assert 'a &amp; b' in file_text
+    assert 'a \\\\ b' in file_text
+    assert 'MathJax' not in file_text
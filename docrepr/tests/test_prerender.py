@@ -0,0 +1,105 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for prerendering whole packages."""
+
+# Standard library imports
+import importlib.util
+import os
+import time
+
+# Third party imports
+import pytest
+
+# Local imports
+import docrepr
+import docrepr.sphinxify
+from docrepr.__main__ import main
+from docrepr.cache import prune_cachedir, render_cache
+from docrepr.prerender import build_oinfos, prerender, public_objects
+
+
+# ---- Test data
+
+# Small package to prerender
+PACKAGE = 'json'
+
+
+# ---- Fixtures
+
+@pytest.fixture(autouse=True)
+def fixture_disk_cache(monkeypatch):
+    """Prerender with the disk cache enabled."""
+    monkeypatch.setitem(docrepr.options, 'disk_cache', True)
+
+
+# ---- Tests
+
+def test_public_objects():
+    """Test that the public objects of a package are listed once."""
+    names = [name for name, __ in public_objects(PACKAGE)]
+    assert names[0] == PACKAGE
+    expected = {'json.dumps', 'json.JSONDecoder', 'json.JSONDecoder.decode'}
+    assert expected.issubset(names)
+    assert len(set(names)) == len(names)
+    assert not [name for name in names if '._' in name]
+
+
+def test_prerender(cachedir, reports):
+    """Test that prerendered pages are found in the cache later."""
+    oinfos = build_oinfos(public_objects(PACKAGE))
+    progress = []
+    result = prerender(
+        oinfos, processes=1,
+        progress=lambda done, total: progress.append((done, total)))
+    assert result == {'rendered': len(oinfos), 'cached': 0, 'failed': []}
+    assert progress[0] == (0, len(oinfos))
+    assert progress[-1] == (len(oinfos), len(oinfos))
+
+    # Pages are found in the on-disk cache by later sessions
+    render_cache.clear()
+    result = prerender(oinfos, processes=1)
+    assert result == {'rendered': 0, 'cached': len(oinfos), 'failed': []}
+    docrepr.sphinxify.rich_repr(oinfos['json.JSONDecoder.decode'])
+    assert reports[-1].cache_hits == 1
+
+
+def test_prerendered_pages_pinned(cachedir):
+    """Test that prerendered pages are not pruned, however old they get."""
+    oinfos = build_oinfos(public_objects(PACKAGE)[:3])
+    prerender(oinfos, processes=1)
+    month_ago = time.time() - 30 * 24 * 60 * 60
+    for root, dirs, files in os.walk(str(cachedir)):
+        for name in dirs + files:
+            os.utime(os.path.join(root, name), (month_ago, month_ago))
+
+    prune_cachedir(str(cachedir), max_size=0, max_age=7 * 24 * 60 * 60)
+    render_cache.clear()
+    result = prerender(oinfos, processes=1)
+    assert result == {'rendered': 0, 'cached': len(oinfos), 'failed': []}
+
+
+def test_cache_key_ignores_addresses():
+    """Test that pages are found again when memory addresses change."""
+    oinfos = [
+        {'name': 'f', 'definition': 'f(x=<object object at %s>)' % address}
+        for address in ['0x7f17f0666330', '0x7f0a1c2b3d40']
+        ]
+    keys = {docrepr.sphinxify.rich_repr_cache_key('rich_repr', oinfo)
+            for oinfo in oinfos}
+    assert len(keys) == 1
+
+
+def test_prerender_command(cachedir, capsys):
+    """Test the prerender command line interface."""
+    assert main(['prerender', PACKAGE, '--processes', '1']) == 0
+    assert 'already cached, 0 failed' in capsys.readouterr().err
+    assert main(['prerender', 'not_a_package']) == 1
+
+
+def test_prerender_command_without_ipython(cachedir, capsys, monkeypatch):
+    """Test that the prerender command explains that IPython is missing."""
+    monkeypatch.setattr(importlib.util, 'find_spec', lambda name: None)
+    assert main(['prerender', PACKAGE]) == 1
+    assert 'docrepr[prerender]' in capsys.readouterr().err
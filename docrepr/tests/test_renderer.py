@@ -0,0 +1,404 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for docrepr's persistent Sphinx renderers."""
+
+# Standard library imports
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+
+# Third party imports
+import pytest
+
+# Local imports
+import docrepr
+import docrepr.cache
+import docrepr.renderer
+import docrepr.sphinxify
+from docrepr.cache import render_cache
+
+
+# ---- Helper functions
+
+def _shared_apps():
+    return [renderer.app for renderer in docrepr.renderer._renderers.values()]
+
+
+# ---- Fixtures
+
+@pytest.fixture(autouse=True)
+def use_renderers():
+    """Make sure docstrings actually go through the renderers."""
+    fast_path = docrepr.options['docutils_fast_path']
+    docrepr.options['docutils_fast_path'] = False
+    render_cache.clear()
+    yield
+    render_cache.clear()
+    docrepr.options['docutils_fast_path'] = fast_path
+
+
+# ---- Tests
+
+def test_renderer_reused(tmp_path):
+    """Test that consecutive renders share the same Sphinx application."""
+    output = docrepr.sphinxify.sphinxify('First *docstring*', str(tmp_path))
+    assert '<em>docstring</em>' in output
+    apps = _shared_apps()
+
+    output = docrepr.sphinxify.sphinxify('Second **docstring**', str(tmp_path))
+    assert '<strong>docstring</strong>' in output
+    assert 'First' not in output
+    assert _shared_apps() == apps
+
+
+def test_temp_confdir_reused(tmp_path, monkeypatch):
+    """Test that renders with temp_confdir share one generated conf dir."""
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    monkeypatch.setattr(docrepr.sphinxify, '_managed_confdirs', {})
+    output = docrepr.sphinxify.sphinxify('First *docstring*',
+                                         temp_confdir=True)
+    assert '<em>docstring</em>' in output
+    confdir, = tmp_path.glob(docrepr.cache.CONFDIR_PREFIX + '*')
+    apps = _shared_apps()
+
+    docrepr.sphinxify.sphinxify('Second docstring', temp_confdir=True)
+    assert list(tmp_path.glob(docrepr.cache.CONFDIR_PREFIX + '*')) == [
+        confdir]
+    assert _shared_apps() == apps
+
+    # A damaged conf dir is generated again by the next process
+    (confdir / 'conf.py').write_text('')
+    monkeypatch.setattr(docrepr.sphinxify, '_managed_confdirs', {})
+    assert docrepr.sphinxify.managed_confdir() == str(confdir)
+    assert (docrepr.sphinxify.conf_digest(str(confdir))
+            == docrepr.sphinxify.conf_digest(docrepr.sphinxify.CONFDIR_PATH))
+
+
+def test_reset_renderers(tmp_path):
+    """Test that resetting the renderers starts a fresh application."""
+    docrepr.sphinxify.sphinxify('A docstring', str(tmp_path))
+    renderers = list(docrepr.renderer._renderers.values())
+    workdirs = [renderer.workdir for renderer in renderers]
+
+    docrepr.sphinxify.reset_renderers()
+    assert not docrepr.renderer._renderers
+    for renderer, workdir in zip(renderers, workdirs):
+        assert renderer.app is None
+        assert not Path(workdir).exists()
+
+    output = docrepr.sphinxify.sphinxify('Another docstring', str(tmp_path))
+    assert 'Another docstring' in output
+
+
+@pytest.mark.parametrize(
+    'docstring, extensions',
+    [
+        ('A *plain* docstring', []),
+        ('Some :math:`x^2` math', ['sphinx.ext.mathjax']),
+        ('.. math::\n\n   x^2', ['sphinx.ext.mathjax']),
+        ('.. autosummary::\n\n   foo', ['sphinx.ext.autosummary']),
+        ('.. plot::\n\n   plot([1, 2])',
+         ['matplotlib.sphinxext.plot_directive']),
+        ],
+    )
+def test_extensions_by_content(tmp_path, docstring, extensions):
+    """Test that renderers only load the extensions a docstring needs."""
+    docrepr.sphinxify.reset_renderers()
+    docrepr.sphinxify.sphinxify(docstring, str(tmp_path))
+    renderers = list(docrepr.renderer._renderers.values())
+    assert [renderer.extensions for renderer in renderers] == [extensions]
+
+
+def test_sphinxify_many(tmp_path, monkeypatch):
+    """Test that a batch of docstrings is rendered in a single build."""
+    docstrings = {
+        'first': 'First *docstring*',
+        'second': 'Second **docstring**',
+        'third': 'Third ``docstring``',
+        }
+    builds = []
+    render_many = docrepr.renderer.Renderer.render_many
+
+    def counting_render_many(self, *args, **kwargs):
+        builds.append(args[0])
+        return render_many(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        docrepr.renderer.Renderer, 'render_many', counting_render_many)
+    outputs = docrepr.sphinxify.sphinxify_many(docstrings, str(tmp_path))
+    assert len(builds) == 1
+    assert list(outputs) == list(docstrings)
+
+    render_cache.clear()
+    for name, docstring in docstrings.items():
+        assert outputs[name] == docrepr.sphinxify.sphinxify(
+            docstring, str(tmp_path))
+
+
+def test_rich_repr_many():
+    """Test that rich_repr_many generates one page per object."""
+    oinfos = {
+        'foo': {'name': 'foo', 'type_name': 'function',
+                'docstring': 'Foo *docstring*'},
+        'bar': {'name': 'bar', 'type_name': 'function',
+                'docstring': 'Bar **docstring**'},
+        }
+    urls = docrepr.sphinxify.rich_repr_many(oinfos)
+    assert list(urls) == ['foo', 'bar']
+    assert len(set(urls.values())) == 2
+    assert '<em>docstring</em>' in Path(urls['foo']).read_text()
+    assert '<strong>docstring</strong>' in Path(urls['bar']).read_text()
+
+
+def test_rich_repr_parallel():
+    """Test that objects rendered in worker processes keep their order."""
+    oinfos = {
+        name: {'name': name, 'type_name': 'function',
+               'docstring': '%s *docstring*' % name}
+        for name in ['spam', 'eggs', 'bacon', 'ham', 'beans']
+        }
+    with docrepr.sphinxify.RenderPool(processes=2, max_renders=2,
+                                      chunksize=1) as pool:
+        urls = pool.rich_repr_many(oinfos)
+    assert list(urls) == list(oinfos)
+    for name, url in urls.items():
+        assert '%s <em>docstring</em>' % name in Path(url).read_text()
+
+    # Pages rendered by the workers are cached in this process too
+    assert docrepr.sphinxify.rich_repr(oinfos['spam']) == urls['spam']
+
+
+def test_builds_serialized(tmp_path, monkeypatch):
+    """Test that renderers in different threads don't build at once."""
+    build = docrepr.renderer.Renderer._build
+    active = []
+    overlaps = []
+
+    def slow_build(self, *args, **kwargs):
+        active.append(self)
+        overlaps.append(len(active) > 1)
+        time.sleep(0.2)
+        try:
+            return build(self, *args, **kwargs)
+        finally:
+            active.remove(self)
+
+    monkeypatch.setattr(docrepr.renderer.Renderer, '_build', slow_build)
+    docstrings = ['Plain *docstring*', 'Some :math:`x^2` math']
+    threads = [
+        threading.Thread(target=docrepr.sphinxify.sphinxify,
+                         args=(docstring, str(tmp_path / str(index))))
+        for index, docstring in enumerate(docstrings)
+        ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(overlaps) == 2
+    assert not any(overlaps)
+
+
+@pytest.mark.asyncio
+async def test_rich_repr_async():
+    """Test that the async API renders the same page as the sync one."""
+    oinfo = {'name': 'foo', 'type_name': 'function',
+             'docstring': 'Foo *docstring*'}
+    url = await docrepr.sphinxify.rich_repr_async(oinfo)
+    assert '<em>docstring</em>' in Path(url).read_text()
+    assert docrepr.sphinxify.rich_repr(oinfo) == url
+
+
+@pytest.mark.asyncio
+async def test_coalescer_latest_wins(monkeypatch):
+    """Test that only the newest request for a pane is rendered."""
+    started = threading.Event()
+    release = threading.Event()
+    rendered = []
+
+    def slow_rich_repr(oinfo):
+        rendered.append(oinfo['name'])
+        started.set()
+        release.wait(10)
+        return oinfo['name']
+
+    monkeypatch.setattr(docrepr.sphinxify, 'rich_repr', slow_rich_repr)
+    coalescer = docrepr.sphinxify.RenderCoalescer()
+    loop = asyncio.get_event_loop()
+
+    first = asyncio.ensure_future(
+        coalescer.rich_repr({'name': 'first'}, pane='help'))
+    await loop.run_in_executor(None, started.wait, 10)
+    second = asyncio.ensure_future(
+        coalescer.rich_repr({'name': 'second'}, pane='help'))
+    third = asyncio.ensure_future(
+        coalescer.rich_repr({'name': 'third'}, pane='help'))
+    other = asyncio.ensure_future(
+        coalescer.rich_repr({'name': 'other'}, pane='console'))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first is None
+    assert await second is None
+    assert await third == 'third'
+    assert await other == 'other'
+    assert sorted(rendered) == ['first', 'other', 'third']
+
+
+def test_in_memory(tmp_path, monkeypatch):
+    """Test that rendering in memory gives the same output as on disk."""
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    docstring = 'A :class:`docstring` with a role'
+    on_disk = docrepr.sphinxify.sphinxify(docstring, str(tmp_path / 'src'))
+    render_cache.clear()
+    assert docrepr.sphinxify.sphinxify(docstring) == on_disk
+
+    # Only the renderer working dirs and the plot cache are created in the
+    # cache dir
+    oinfo = {'name': 'foo', 'type_name': 'function',
+             'docstring': ('.. plot::\n\n'
+                           '   >>> import matplotlib.pyplot as plt\n'
+                           '   >>> plt.plot([1, 2])')}
+    entries = set(tmp_path.iterdir())
+    page = docrepr.sphinxify.rich_repr_html(oinfo)
+    new_entries = set(tmp_path.iterdir()) - entries
+    assert all(path.name.startswith(docrepr.cache.RENDERER_PREFIX)
+               or path.name == docrepr.cache.PLOT_CACHE_DIRNAME
+               for path in new_entries)
+    assert 'src="data:image/png;base64,' in page
+    assert '_images/' not in page
+
+
+def test_output_placement(tmp_path, monkeypatch):
+    """Test that build output is linked rather than copied to srcdir."""
+    docrepr.sphinxify.reset_renderers()
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    docstring = ('.. plot::\n\n'
+                 '   >>> import matplotlib.pyplot as plt\n'
+                 '   >>> plt.plot([1, 2])')
+    srcdirs = [tmp_path / 'first', tmp_path / 'second']
+    for srcdir in srcdirs:
+        srcdir.mkdir()
+        docrepr.sphinxify.sphinxify(docstring, str(srcdir))
+
+    # Static files are shared by all srcdirs
+    static_dirs = {(srcdir / '_static').resolve() for srcdir in srcdirs}
+    assert len(static_dirs) == 1
+    static_dir = static_dirs.pop()
+    assert static_dir.name.startswith(docrepr.cache.STATIC_PREFIX)
+    assert any(static_dir.iterdir())
+
+    # Images are hard links to the build output
+    renderer, = docrepr.renderer._renderers.values()
+    image, = (srcdirs[-1] / '_images').iterdir()
+    build_image = Path(renderer.app.outdir) / '_images' / image.name
+    assert image.stat().st_ino == build_image.stat().st_ino
+    assert not (srcdirs[-1] / 'search.html').exists()
+
+
+def test_static_link_race(tmp_path, monkeypatch):
+    """Test that a static link placed by another build at once is kept."""
+    docrepr.sphinxify.reset_renderers()
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    symlink = os.symlink
+
+    def racing_symlink(source, destination, *args, **kwargs):
+        symlink(source, destination, *args, **kwargs)
+        raise FileExistsError(destination)
+
+    monkeypatch.setattr(docrepr.renderer.os, 'symlink', racing_symlink)
+    srcdir = tmp_path / 'src'
+    srcdir.mkdir()
+    docrepr.sphinxify.sphinxify('A *docstring*', str(srcdir))
+    static_dir = (srcdir / '_static').resolve()
+    assert static_dir.name.startswith(docrepr.cache.STATIC_PREFIX)
+    assert any(static_dir.iterdir())
+
+
+def test_doctrees_reused(monkeypatch):
+    """Test that docstrings rendered before are not parsed again."""
+    docrepr.sphinxify.reset_renderers()
+    docstring = 'A :class:`docstring` with a role'
+    output = docrepr.sphinxify.sphinxify(docstring)
+    renderer, = docrepr.renderer._renderers.values()
+    read = []
+    renderer.app.connect('doctree-read', lambda app, doctree: read.append(
+        app.env.docname))
+
+    render_cache.clear()
+    assert docrepr.sphinxify.sphinxify(docstring) == output
+    assert read == []
+
+    # Only the most recently used doctrees are kept
+    monkeypatch.setitem(docrepr.options, 'doctree_cache_size', 1)
+    docrepr.sphinxify.sphinxify('Another :class:`docstring`')
+    render_cache.clear()
+    assert docrepr.sphinxify.sphinxify(docstring) == output
+    assert read == [renderer.docname('Another :class:`docstring`'),
+                    renderer.docname(docstring)]
+    docnames = set(renderer.app.env.all_docs)
+    assert docnames == {docrepr.renderer.DOCNAME, renderer.docname(docstring)}
+
+
+def test_in_memory_files(tmp_path, monkeypatch):
+    """Test that in-memory renders write no files once the app exists."""
+    docrepr.sphinxify.reset_renderers()
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    docrepr.sphinxify.sphinxify('A first docstring')
+    files = set(tmp_path.glob('**/*'))
+
+    docrepr.sphinxify.sphinxify('A :class:`new` docstring')
+    assert set(tmp_path.glob('**/*')) == files
+    assert not [path for path in files
+                if path.suffix in ('.doctree', '.pickle')]
+
+
+def test_plot_cache(tmp_path, monkeypatch):
+    """Test that plot images are reused by other renderers."""
+    from matplotlib.sphinxext import plot_directive
+
+    docrepr.sphinxify.reset_renderers()
+    monkeypatch.setattr(docrepr.sphinxify, 'CACHEDIR', str(tmp_path))
+    docstring = ('.. plot::\n\n'
+                 '   >>> import matplotlib.pyplot as plt\n'
+                 '   >>> plt.plot([3, 1, 2])')
+    output = docrepr.sphinxify.sphinxify(docstring)
+    assert 'src="data:image/png;base64,' in output
+
+    # Plot code runs in a working dir of the renderer
+    renderer, = docrepr.renderer._renderers.values()
+    assert renderer.app.config.plot_working_directory == str(
+        Path(renderer.workdir) / 'plots')
+    entries = list((tmp_path / docrepr.cache.PLOT_CACHE_DIRNAME).glob('*/*'))
+    assert len(entries) == 1
+
+    # A fresh renderer gets the images from the cache
+    docrepr.sphinxify.reset_renderers()
+    render_cache.clear()
+    monkeypatch.setattr(plot_directive, '_run_code', None)
+    assert docrepr.sphinxify.sphinxify(docstring) == output
+
+
+def test_plot_cache_scoped(tmp_path):
+    """Test that other Sphinx apps still run their plots themselves."""
+    from sphinx.application import Sphinx
+
+    # Installs the cache in the plot directive
+    docrepr.sphinxify.sphinxify('.. plot::\n\n   plot([1, 2])')
+
+    srcdir = tmp_path / 'src'
+    srcdir.mkdir()
+    (srcdir / 'conf.py').write_text(
+        "extensions = ['matplotlib.sphinxext.plot_directive']\n")
+    (srcdir / 'index.rst').write_text(
+        'Plot\n====\n\n.. plot::\n\n'
+        '   import matplotlib.pyplot as plt\n'
+        '   plt.plot([2, 3])\n')
+    app = Sphinx(str(srcdir), str(srcdir), str(tmp_path / 'build'),
+                 str(tmp_path / 'doctrees'), 'html', status=None,
+                 warning=None)
+    app.build()
+    assert (tmp_path / 'build' / '_images' / 'index-1.png').is_file()
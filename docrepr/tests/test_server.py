@@ -0,0 +1,202 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for docrepr's render server."""
+
+# Standard library imports
+import http.server
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Third party imports
+import pytest
+
+# Local imports
+import docrepr
+import docrepr.server
+import docrepr.sphinxify
+from docrepr.cache import SERVER_FILENAME
+from docrepr.server import process_exists
+
+
+# ---- Test data
+
+OINFO = {
+    'name': 'foo',
+    'type_name': 'function',
+    'docstring': 'Foo :math:`x^2` *docstring*',
+    }
+
+# Maximum time to wait for the server to start, in seconds
+START_TIMEOUT = 60
+
+
+# ---- Fixtures
+
+@pytest.fixture(name='server')
+def fixture_server(cachedir):
+    """Run a render server on the cache directory."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(Path(__file__).parents[2]), env.get('PYTHONPATH', '')])
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'docrepr', 'serve', '--cachedir',
+         str(cachedir)],
+        env=env, stdout=subprocess.PIPE, universal_newlines=True)
+    process.stdout.readline()
+    server_file = cachedir / SERVER_FILENAME
+    deadline = time.monotonic() + START_TIMEOUT
+    while not server_file.is_file():
+        assert process.poll() is None and time.monotonic() < deadline
+        time.sleep(0.1)
+    yield process
+    process.terminate()
+    process.wait()
+    process.stdout.close()
+
+
+@pytest.fixture(name='stub_server')
+def fixture_stub_server(cachedir):
+    """
+    Run a server on the cache directory that answers with a fixed body.
+
+    Yields a dict in which tests set the ``body`` of the responses.
+    """
+    response = {'body': b''}
+
+    class StubHandler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(response['body'])))
+            self.end_headers()
+            self.wfile.write(response['body'])
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.HTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    server_file = cachedir / SERVER_FILENAME
+    server_file.write_text(json.dumps(
+        {'port': server.server_port, 'token': 'stub', 'pid': os.getpid()}))
+    server_file.chmod(0o600)
+    yield response
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+# ---- Tests
+
+def test_rich_repr_on_server(server, cachedir, reports):
+    """Test that pages are rendered by the server when it's running."""
+    url = docrepr.sphinxify.rich_repr(OINFO)
+    assert Path(url).parent.parent == cachedir
+    assert '<em>docstring</em>' in Path(url).read_text(encoding='utf-8')
+    html = docrepr.sphinxify.rich_repr_html(OINFO)
+    assert '<em>docstring</em>' in html
+
+    for stats in reports:
+        assert 'server' in stats.stages
+        assert 'build' not in stats.stages
+
+    # The server removes its file when stopped
+    server.terminate()
+    server.wait()
+    assert not (cachedir / SERVER_FILENAME).exists()
+
+
+def test_server_file_permissions(server, cachedir):
+    """Test that only the owner can read the token of the server."""
+    if os.name == 'nt':
+        pytest.skip('File permissions are not enforced on Windows')
+    server_file = cachedir / SERVER_FILENAME
+    assert server_file.stat().st_mode & 0o777 == 0o600
+
+
+@pytest.mark.parametrize('server_file_text', [
+    json.dumps({'port': 1, 'token': 'unused', 'pid': 0}),
+    'not json',
+    ], ids=['unreachable', 'invalid'])
+def test_fallback(cachedir, reports, server_file_text):
+    """Test that pages are rendered in-process if the server is missing."""
+    (cachedir / SERVER_FILENAME).write_text(
+        server_file_text, encoding='utf-8')
+    url = docrepr.sphinxify.rich_repr(OINFO)
+    assert '<em>docstring</em>' in Path(url).read_text(encoding='utf-8')
+    stats, = reports
+    assert 'build' in stats.stages
+
+
+def test_process_exists():
+    """Test that servers that are not running are detected."""
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    assert not process_exists(process.pid)
+    assert process_exists(os.getpid())
+
+
+def test_wrong_token(server, cachedir, reports):
+    """Test that requests without the server token are rejected."""
+    server_file = cachedir / SERVER_FILENAME
+    server_info = json.loads(server_file.read_text(encoding='utf-8'))
+    server_info['token'] = 'wrong'
+    server_file.write_text(json.dumps(server_info), encoding='utf-8')
+    docrepr.sphinxify.rich_repr(OINFO)
+    stats, = reports
+    assert 'server' in stats.stages and 'build' in stats.stages
+
+
+def test_render_server_option(server, monkeypatch, reports):
+    """Test that the server is not used if the option is disabled."""
+    monkeypatch.setitem(docrepr.options, 'render_server', False)
+    docrepr.sphinxify.rich_repr(OINFO)
+    stats, = reports
+    assert 'server' not in stats.stages
+
+
+def test_workers_render_themselves(server, cachedir, monkeypatch, reports):
+    """Test that pool workers don't send their chunks to the server."""
+    monkeypatch.setitem(docrepr.options, 'render_server', True)
+    monkeypatch.setitem(docrepr.options, 'concurrent_class_docstring', False)
+    args = (dict(docrepr.options), str(cachedir), [OINFO])
+    url, = docrepr.sphinxify._render_chunk(args)
+    assert '<em>docstring</em>' in Path(url).read_text(encoding='utf-8')
+    stats, = reports
+    assert 'server' not in stats.stages
+
+
+@pytest.mark.parametrize('body', [
+    b'not json',
+    b'{"outputs": ',
+    b'{"other": []}',
+    b'{"outputs": 1}',
+    json.dumps({'outputs': ['/etc/passwd']}).encode('utf-8'),
+    ], ids=['invalid', 'truncated', 'missing', 'wrong_type', 'outside'])
+def test_invalid_response(stub_server, reports, body):
+    """Test that pages are rendered in-process if the response is invalid."""
+    stub_server['body'] = body
+    url = docrepr.sphinxify.rich_repr(OINFO)
+    assert '<em>docstring</em>' in Path(url).read_text(encoding='utf-8')
+    stats, = reports
+    assert 'server' in stats.stages and 'build' in stats.stages
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='Needs POSIX permissions')
+@pytest.mark.parametrize('path', ['cachedir', 'server_file'])
+def test_writable_by_others(stub_server, cachedir, reports, path):
+    """Test that server files other users could have written are ignored."""
+    target = cachedir / SERVER_FILENAME if path == 'server_file' else cachedir
+    target.chmod(target.stat().st_mode | 0o022)
+    docrepr.sphinxify.rich_repr(OINFO)
+    stats, = reports
+    assert 'build' in stats.stages
+    assert docrepr.server.read_server_file(str(cachedir)) is None
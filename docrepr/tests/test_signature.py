@@ -0,0 +1,88 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for docrepr's signature and markup detection."""
+
+# Standard library imports
+import time
+
+# Third party imports
+import pytest
+
+# Local imports
+from docrepr.fastpath import SPHINX_MARKUP_RE
+from docrepr.sphinxify import (EXTENSION_MARKUP_RE, get_signature_from_text,
+                               is_sphinx_markup)
+
+
+# ---- Test data
+
+SIGNATURES = [
+    ('foo(a, b=1)\n\nDo something.', 'foo', '(a, b=1)'),
+    ('foo(a,\n    b)\n\nOn two lines.', 'foo', '(a,\n    b)'),
+    ('foo(a),\nfoo(b)\n\nSeveral signatures.', 'foo', '(b)'),
+    ('foo(a),\n  b),\n  c)\n\nContinued.', 'foo', '(a),\n  b),\n  c)'),
+    ('foo()\n\nNo arguments.', 'foo', ''),
+    ('No signature at all.', 'foo', ''),
+    ('', 'foo', ''),
+    (None, None, ''),
+    ('InspectorXinfo(a)', 'Inspector.info', ''),
+    ('Inspector.info(a)', 'Inspector.info', '(a)'),
+    ]
+
+# Docstrings that used to take quadratic time (or worse) to scan
+PATHOLOGICAL_DOCSTRINGS = {
+    'unclosed_calls': lambda size: 'f(a' * size,
+    'unclosed_lines': lambda size: ('f(' + 'a ' * 5) * size,
+    'continued_lines': lambda size: 'f(a),\n' * size,
+    'blank_lines': lambda size: '\n' * (10 * size),
+    'colons': lambda size: ':a' * (5 * size),
+    }
+
+BENCHMARK_SIZE = 4000
+
+
+# ---- Helper functions
+
+def _scan(docstring):
+    get_signature_from_text(docstring, 'f')
+    is_sphinx_markup(docstring)
+    SPHINX_MARKUP_RE.search(docstring)
+    for markup_re in EXTENSION_MARKUP_RE.values():
+        markup_re.search(docstring)
+
+
+def _scan_time(docstring):
+    """Best time of a few scans of `docstring`, to reduce noise."""
+    times = []
+    for __ in range(3):
+        start = time.perf_counter()
+        _scan(docstring)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# ---- Tests
+
+@pytest.mark.parametrize('text, objname, signature', SIGNATURES)
+def test_get_signature_from_text(text, objname, signature):
+    """Test that signatures are found in docstrings."""
+    assert get_signature_from_text(text, objname) == signature
+
+
+def test_is_sphinx_markup():
+    """Test the detection of Sphinx-style fields."""
+    assert is_sphinx_markup('Spam.\n\n:param eggs: Eggs.')
+    assert is_sphinx_markup('Spam.\n\n\n  :return: Eggs.')
+    assert not is_sphinx_markup('Spam.\n\nparam eggs: Eggs.')
+
+
+@pytest.mark.parametrize('make_docstring', PATHOLOGICAL_DOCSTRINGS.values(),
+                         ids=list(PATHOLOGICAL_DOCSTRINGS))
+def test_scan_time_linear(make_docstring):
+    """Micro-benchmark showing that scanning takes linear time."""
+    small_time = _scan_time(make_docstring(BENCHMARK_SIZE))
+    large_time = _scan_time(make_docstring(4 * BENCHMARK_SIZE))
+    # Linear time means a ratio of ~4; quadratic would be ~16
+    assert large_time < 0.01 + 8 * small_time
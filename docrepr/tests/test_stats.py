@@ -0,0 +1,60 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for docrepr's render instrumentation."""
+
+# Standard library imports
+from pathlib import Path
+
+# Local imports
+import docrepr.sphinxify
+import docrepr.stats
+
+
+# ---- Test data
+
+OINFO = {
+    'name': 'foo',
+    'type_name': 'function',
+    'docstring': 'Foo :math:`x^2` docstring',
+    }
+
+
+# ---- Tests
+
+def test_rich_repr_stats(reports):
+    """Test that the stats of a rich_repr call are reported once."""
+    url = docrepr.sphinxify.rich_repr(OINFO)
+    stats, = reports
+    assert stats.function == 'rich_repr'
+    assert {'wrap', 'build', 'read_output', 'template', 'write'}.issubset(
+        stats.stages)
+    assert sum(stats.stages.values()) <= stats.duration
+    assert stats.cache_misses == 2
+    assert stats.cache_hits == 0
+    assert stats.bytes_written == Path(url).stat().st_size
+    assert stats.extensions == [['sphinx.ext.mathjax']]
+
+    docrepr.sphinxify.rich_repr(OINFO)
+    stats = reports[-1]
+    assert stats.cache_hits == 1
+    assert stats.cache_misses == 0
+    assert set(stats.stages) == {'cache'}
+
+
+def test_no_observers():
+    """Test that nothing is recorded without observers."""
+    with docrepr.stats.record('sphinxify'):
+        assert docrepr.stats.current_stats() is None
+        with docrepr.stats.stage('build'):
+            pass
+
+
+def test_remove_observer(reports):
+    """Test that removed observers are no longer called."""
+    docrepr.sphinxify.sphinxify('Some *docstring*')
+    docrepr.sphinxify.remove_observer(reports.append)
+    docrepr.sphinxify.sphinxify('Another *docstring*')
+    assert len(reports) == 1
+    assert reports[0].function == 'sphinxify'
@@ -0,0 +1,107 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""Tests for the plain text rendering of docstrings."""
+
+# Third party imports
+import pytest
+
+# Local imports
+import docrepr.sphinxify
+from docrepr.text import ANSI_RE, render_text
+
+
+# ---- Test data
+
+NUMPYDOC = """
+Trigonometric sine, element-wise.
+
+Parameters
+----------
+x : array_like
+    Angle, in radians (:math:`2 \\pi` rad equals 360 degrees), of a very
+    long parameter description that needs to be wrapped.
+
+Returns
+-------
+y : array_like
+    The sine of each element of x.
+
+See Also
+--------
+arcsin, sinh, cos
+
+Examples
+--------
+>>> np.sin(np.pi/2.)
+1.0
+"""
+
+SPHINX_MARKUP = {
+    'role': ('See :func:`print` and :class:`~collections.OrderedDict`.',
+             'See "print()" and "OrderedDict".\n'),
+    'inline': ('Some *emphasis*, **strong** and ``literal`` text.',
+               'Some *emphasis*, **strong** and "literal" text.\n'),
+    'version': ('Text\n\n.. versionadded:: 1.0\n   More text.\n',
+                'Text\n\n*Added in version 1.0:* More text.\n'),
+    'note': ('.. note:: Be careful.\n', 'Note:\n    Be careful.\n'),
+    'plot': ('.. plot::\n   :include-source:\n\n   plt.plot([1, 2])\n',
+             '    plt.plot([1, 2])\n'),
+    'index': ('.. index:: foo\n\nText\n', 'Text\n'),
+    }
+
+
+# ---- Tests
+
+def test_numpydoc():
+    """Test rendering a NumPy-style docstring."""
+    text = render_text(NUMPYDOC, width=50)
+    lines = text.splitlines()
+    assert lines[:5] == [
+        'Trigonometric sine, element-wise.', '', 'Parameters', '-' * 10, '']
+    assert 'x : array_like' in lines
+    assert '    Angle, in radians (2 \\pi rad equals 360' in lines
+    assert '>>> np.sin(np.pi/2.)' in lines
+    assert max(len(line) for line in lines) <= 50
+
+
+@pytest.mark.parametrize('width', [20, 40, 100])
+def test_width(width):
+    """Test that text is wrapped to the given width."""
+    text = render_text(NUMPYDOC, width=width)
+    assert max(len(line) for line in text.splitlines()) <= width
+
+
+@pytest.mark.parametrize(
+    'docstring, expected', SPHINX_MARKUP.values(), ids=SPHINX_MARKUP.keys())
+def test_sphinx_markup(docstring, expected):
+    """Test that Sphinx roles and directives are rendered without Sphinx."""
+    assert render_text(docstring, width=79) == expected
+
+
+def test_independent_of_sphinx():
+    """Test that the roles and directives Sphinx registers aren't used."""
+    docstring = SPHINX_MARKUP['plot'][0] + '\nSee :func:`print`.\n'
+    expected = render_text(docstring, width=79)
+    docrepr.sphinxify.sphinxify(docstring)
+    assert render_text(docstring, width=79) == expected
+
+
+def test_ansi():
+    """Test that ANSI styled text has the same words as plain text."""
+    text = render_text(NUMPYDOC, width=50, ansi=True)
+    assert '\x1b[1;4mParameters\x1b[0m' in text
+    assert '----------' not in text
+    plain_lines = [
+        line for line in render_text(NUMPYDOC, width=50).splitlines()
+        if not line or line.strip('-')]
+    assert ANSI_RE.sub('', text).splitlines() == plain_lines
+
+
+def test_sphinxify_text():
+    """Test rendering text from the sphinxify module."""
+    assert docrepr.sphinxify.sphinxify_text('A *test*', width=79) == (
+        'A *test*\n')
+    assert docrepr.sphinxify.sphinxify_text('') == (
+        'No documentation available\n')
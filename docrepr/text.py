@@ -0,0 +1,691 @@
+# Copyright (c) 2013- The Spyder Development Team and Docrepr Contributors
+#
+# Distributed under the terms of the BSD BSD 3-Clause License
+
+"""
+Render docstrings to plain text with docutils alone.
+
+This is meant for terminals and pagers (e.g. IPython's ``obj?``), where
+running a Sphinx build for each docstring would be noticeable. The output
+follows the conventions of Sphinx's text builder, but is wrapped to the
+terminal width and can be styled with ANSI escape codes.
+
+Sphinx registers its roles and directives in docutils' global registries,
+which only work within a Sphinx build. So that the output doesn't depend on
+whether Sphinx ran before in the same process, roles and directives are
+resolved here by the parser itself: Sphinx cross-references are shown as
+literals, version changes and "see also" boxes are rendered as Sphinx does
+and the content of any other directive (plots, code blocks, etc) is shown
+verbatim.
+"""
+
+# Stdlib imports
+import re
+import shutil
+
+# 3rd party imports
+from docutils import nodes, utils
+from docutils.core import publish_doctree
+from docutils.parsers import rst
+from docutils.parsers.rst import Directive, directives, states
+from docutils.parsers.rst.directives import (
+    admonitions, body, images, misc, tables)
+
+
+#-----------------------------------------------------------------------------
+# Globals and constants
+#-----------------------------------------------------------------------------
+SETTINGS = {
+    'doctitle_xform': False,
+    'docinfo_xform': False,
+    'sectsubtitle_xform': False,
+    'smart_quotes': False,
+    'file_insertion_enabled': False,
+    'raw_enabled': False,
+    'report_level': 5,
+    'halt_level': 5,
+    }
+
+# Characters used to underline section titles, by level. Docstring sections
+# (Parameters, Returns, etc) are usually top level ones underlined with "-"
+SECTION_CHARS = '-~^"+`'
+
+# Indentation of nested blocks (definitions, quotes, etc)
+INDENT = 4
+
+# ANSI codes used to style each kind of text
+ANSI_STYLES = {
+    'emphasis': '3',
+    'strong': '1',
+    'literal': '36',
+    'title': '1;4',
+    'label': '1',
+    }
+
+ANSI_RE = re.compile('\x1b\\[[0-9;]*m')
+
+# Markers used for each kind of text without ANSI styling, as in Sphinx
+PLAIN_MARKERS = {
+    'emphasis': '*',
+    'strong': '**',
+    'literal': '"',
+    'title': '',
+    'label': '',
+    }
+
+# Sphinx's labels of version changes
+VERSION_LABELS = {
+    'versionadded': 'Added in version %s',
+    'versionchanged': 'Changed in version %s',
+    'deprecated': 'Deprecated since version %s',
+    'versionremoved': 'Removed in version %s',
+    }
+
+# Roles rendered as literals. Unknown roles (e.g. Sphinx cross-references)
+# are rendered as literals too, just with their title
+LITERAL_ROLES = {
+    'literal', 'code', 'samp', 'kbd', 'file', 'command', 'program', 'envvar',
+    'option', 'regexp', 'makevar', 'mimetype', 'dfn',
+    }
+
+# Cross-references to functions, which Sphinx shows with parentheses
+FUNCTION_ROLES = {'func', 'meth', 'py:func', 'py:meth'}
+
+# Nodes that don't produce any text
+SKIPPED_NODES = (
+    nodes.comment, nodes.target, nodes.substitution_definition,
+    nodes.system_message, nodes.pending, nodes.raw, nodes.decoration,
+    nodes.docinfo,
+    )
+
+
+#-----------------------------------------------------------------------------
+# Roles and directives
+#-----------------------------------------------------------------------------
+class AnyOptions(dict):
+    """Option spec accepting any option, to not fail on unknown ones."""
+
+    def __missing__(self, key):
+        return directives.unchanged
+
+    def __bool__(self):
+        return True
+
+
+class IgnoredDirective(Directive):
+    """Directive without any output (indexes, highlighting, etc)."""
+
+    optional_arguments = 1
+    final_argument_whitespace = True
+    option_spec = AnyOptions()
+    has_content = True
+
+    def run(self):
+        return []
+
+
+class VerbatimDirective(IgnoredDirective):
+    """Directive whose arguments and content are shown verbatim."""
+
+    def run(self):
+        text = '\n'.join(self.arguments + list(self.content)).strip('\n')
+        if not text:
+            return []
+        return [nodes.literal_block(text, text)]
+
+
+class VersionChange(Directive):
+    """The ``versionadded``, ``versionchanged``, etc, Sphinx directives."""
+
+    required_arguments = 1
+    optional_arguments = 1
+    final_argument_whitespace = True
+    has_content = True
+
+    def run(self):
+        node = nodes.container()
+        if len(self.arguments) > 1:
+            inlines, messages = self.state.inline_text(
+                self.arguments[1], self.lineno)
+            node += nodes.paragraph(self.arguments[1], '', *inlines)
+            node += messages
+        self.state.nested_parse(self.content, self.content_offset, node)
+
+        name = self.name.replace('version-', 'version')
+        name = 'deprecated' if name == 'versiondeprecated' else name
+        label = VERSION_LABELS[name] % self.arguments[0]
+        if node.children and isinstance(node[0], nodes.paragraph):
+            node[0][0:0] = [
+                nodes.emphasis(label, label + ':'), nodes.Text(' ')]
+        else:
+            node.insert(0, nodes.paragraph(
+                '', '', nodes.emphasis(label, label + '.')))
+        return [node]
+
+
+class SeeAlso(Directive):
+    """The ``seealso`` Sphinx directive."""
+
+    optional_arguments = 1
+    final_argument_whitespace = True
+    has_content = True
+
+    def run(self):
+        node = nodes.admonition()
+        node += nodes.title('See also', 'See also')
+        if self.arguments:
+            inlines, messages = self.state.inline_text(
+                self.arguments[0], self.lineno)
+            node += nodes.paragraph(self.arguments[0], '', *inlines)
+            node += messages
+        self.state.nested_parse(self.content, self.content_offset, node)
+        return [node]
+
+
+# Directives known by the parser. Any other is a `VerbatimDirective`
+DIRECTIVES = {
+    'admonition': admonitions.Admonition,
+    'attention': admonitions.Attention,
+    'caution': admonitions.Caution,
+    'danger': admonitions.Danger,
+    'error': admonitions.Error,
+    'hint': admonitions.Hint,
+    'important': admonitions.Important,
+    'note': admonitions.Note,
+    'tip': admonitions.Tip,
+    'warning': admonitions.Warning,
+    'seealso': SeeAlso,
+    'rubric': body.Rubric,
+    'topic': body.Topic,
+    'epigraph': body.Epigraph,
+    'highlights': body.Highlights,
+    'pull-quote': body.PullQuote,
+    'compound': body.Compound,
+    'container': body.Container,
+    'line-block': body.LineBlock,
+    'parsed-literal': body.ParsedLiteral,
+    'table': tables.RSTTable,
+    'list-table': tables.ListTable,
+    'csv-table': tables.CSVTable,
+    'image': images.Image,
+    'figure': images.Figure,
+    'replace': misc.Replace,
+    'unicode': misc.Unicode,
+    'versionadded': VersionChange,
+    'versionchanged': VersionChange,
+    'deprecated': VersionChange,
+    'versionremoved': VersionChange,
+    'version-added': VersionChange,
+    'version-changed': VersionChange,
+    'version-deprecated': VersionChange,
+    'version-removed': VersionChange,
+    }
+
+for _name in ('index', 'toctree', 'only', 'highlight', 'currentmodule',
+              'module', 'default-role', 'default-domain', 'tabularcolumns',
+              'raw', 'meta', 'include', 'contents', 'sectnum', 'class'):
+    DIRECTIVES[_name] = IgnoredDirective
+
+
+def xref_title(text):
+    """Return the text Sphinx shows for a cross-reference."""
+    match = re.match(r'(?s)(.*?)\s*<(.*)>$', text)
+    if match and match.group(1):
+        return match.group(1)
+    text = text.lstrip('!')
+    if text.startswith('~'):
+        text = text[1:].rpartition('.')[2]
+    return text
+
+
+def interpreted(rawsource, text, role, lineno):
+    """
+    Resolve a role without docutils' registry.
+
+    This replaces the `interpreted` method of the inline parser.
+    """
+    role = role.lower() if role else ''
+    # Backslashes are part of LaTeX code, so they're not escapes in math
+    text = utils.unescape(text, restore_backslashes=(role == 'math'))
+    if role in {'', 't', 'title', 'title-reference'}:
+        node = nodes.title_reference(rawsource, text)
+    elif role == 'emphasis':
+        node = nodes.emphasis(rawsource, text)
+    elif role == 'strong':
+        node = nodes.strong(rawsource, text)
+    elif role == 'math':
+        node = nodes.math(rawsource, text)
+    elif role in LITERAL_ROLES:
+        node = nodes.literal(rawsource, text)
+    elif role in {'pep', 'rfc'}:
+        node = nodes.inline(rawsource, '%s %s' % (role.upper(), text))
+    elif role in {'sub', 'subscript', 'sup', 'superscript', 'abbr',
+                  'guilabel', 'menuselection'}:
+        node = nodes.inline(rawsource, text)
+    else:
+        title = xref_title(text)
+        if role in FUNCTION_ROLES and title == text and title[-1:] != ')':
+            title += '()'
+        node = nodes.literal(rawsource, title)
+    return [node], []
+
+
+class LocalDirectivesMixin:
+    """Parser state looking up directives in `DIRECTIVES`."""
+
+    # Nested state machines are cached by class, so they must not be
+    # shared with the standard states
+    nested_sm_cache = []
+
+    def __init__(self, state_machine, debug=False):
+        super().__init__(state_machine, debug)
+        # This dict is shared with the other nested parsing arguments
+        self.nested_sm_kwargs['state_classes'] = STATE_CLASSES
+
+    def directive(self, match, **option_presets):
+        type_name = match.group(1)
+        directive_class = DIRECTIVES.get(type_name.lower(), VerbatimDirective)
+        return self.run_directive(
+            directive_class, match, type_name, option_presets)
+
+
+LocalDirectivesMixin.explicit = states.Struct(
+    patterns=states.Body.explicit.patterns,
+    constructs=[
+        (LocalDirectivesMixin.directive
+         if method is states.Body.directive else method, pattern)
+        for method, pattern in states.Body.explicit.constructs
+        ],
+    )
+
+STATE_CLASSES = tuple(
+    type(state_class.__name__, (LocalDirectivesMixin, state_class), {})
+    for state_class in states.state_classes)
+
+
+class Parser(rst.Parser):
+    """reST parser resolving roles and directives by itself."""
+
+    def __init__(self):
+        inliner = states.Inliner()
+        inliner.interpreted = interpreted
+        super().__init__(inliner=inliner)
+        self.state_classes = STATE_CLASSES
+
+
+#-----------------------------------------------------------------------------
+# Text writer
+#-----------------------------------------------------------------------------
+def visible_len(text):
+    """Length of `text` on the terminal, without ANSI codes."""
+    return len(ANSI_RE.sub('', text))
+
+
+def wrap(text, width):
+    """Wrap `text` into lines of `width` visible characters at most."""
+    lines = []
+    line = []
+    length = 0
+    for word in text.split():
+        word_len = visible_len(word)
+        if line and length + 1 + word_len > width:
+            lines.append(' '.join(line))
+            line = []
+            length = 0
+        length += word_len + (1 if line else 0)
+        line.append(word)
+    if line:
+        lines.append(' '.join(line))
+    return lines
+
+
+def indent(lines, first, width=None):
+    """
+    Prefix the first of `lines` with `first` and indent the rest as much.
+
+    If `width` is given, that's the indentation of the rest instead.
+    """
+    rest = ' ' * (len(first) if width is None else width)
+    return [
+        ((first if i == 0 else rest) + line if line else line).rstrip()
+        for i, line in enumerate(lines)
+        ]
+
+
+def join_blocks(blocks, separator=True):
+    """Join blocks of lines, separated by blank lines if `separator`."""
+    lines = []
+    for block in blocks:
+        if not block:
+            continue
+        if lines and separator:
+            lines.append('')
+        lines.extend(block)
+    return lines
+
+
+def roman(number):
+    """Return `number` in roman numerals."""
+    numerals = [
+        (1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'), (100, 'C'),
+        (90, 'XC'), (50, 'L'), (40, 'XL'), (10, 'X'), (9, 'IX'), (5, 'V'),
+        (4, 'IV'), (1, 'I'),
+        ]
+    result = ''
+    for value, numeral in numerals:
+        while number >= value:
+            result += numeral
+            number -= value
+    return result
+
+
+class TextTranslator:
+    """
+    Render a doctree to lines of plain text.
+
+    Blocks are rendered by the ``block_<node>`` methods, which return
+    a list of lines for a given width, and inline text by the
+    ``inline_<node>`` ones, which return a string.
+    """
+
+    def __init__(self, width, ansi=False):
+        self.width = width
+        self.ansi = ansi
+        self.section_level = 0
+
+    def style(self, text, name):
+        """Style `text` as emphasis, strong text, etc."""
+        if not self.ansi:
+            marker = PLAIN_MARKERS[name]
+            return marker + text + marker
+        # Each word is styled on its own, in case the text is wrapped
+        return re.sub(
+            r'\S+', '\x1b[%sm\\g<0>\x1b[0m' % ANSI_STYLES[name], text)
+
+    def render(self, doctree):
+        """Render `doctree` to text."""
+        lines = self.blocks(doctree, self.width)
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    # ---- Blocks
+
+    def blocks(self, node, width, separator=True):
+        """Render the children of `node` as blocks."""
+        return join_blocks(
+            [self.block(child, width) for child in node.children], separator)
+
+    def block(self, node, width):
+        """Render a block node."""
+        if isinstance(node, SKIPPED_NODES):
+            return []
+        method = getattr(self, 'block_' + node.tagname, None)
+        if method is not None:
+            return method(node, width)
+        if isinstance(node, nodes.Admonition):
+            return self.admonition(node, width)
+        if isinstance(node, (nodes.TextElement, nodes.Text)):
+            return wrap(self.inline(node), width)
+        return self.blocks(node, width)
+
+    def block_section(self, node, width):
+        self.section_level += 1
+        try:
+            return self.blocks(node, width)
+        finally:
+            self.section_level -= 1
+
+    def block_title(self, node, width):
+        title = self.inline(node)
+        if self.ansi:
+            return wrap(self.style(title, 'title'), width)
+        level = min(max(self.section_level, 1), len(SECTION_CHARS))
+        char = SECTION_CHARS[level - 1]
+        return [title, char * visible_len(title)]
+
+    def block_rubric(self, node, width):
+        return wrap(self.style(self.inline(node), 'label'), width)
+
+    def block_bullet_list(self, node, width):
+        bullet = node.get('bullet', '*') + ' '
+        return self.list_items(node, [bullet] * len(node.children), width)
+
+    def block_enumerated_list(self, node, width):
+        start = node.get('start', 1)
+        labels = []
+        for number in range(start, start + len(node.children)):
+            enumtype = node.get('enumtype', 'arabic')
+            if enumtype == 'loweralpha':
+                label = chr(ord('a') + number - 1)
+            elif enumtype == 'upperalpha':
+                label = chr(ord('A') + number - 1)
+            elif enumtype == 'lowerroman':
+                label = roman(number).lower()
+            elif enumtype == 'upperroman':
+                label = roman(number)
+            else:
+                label = str(number)
+            labels.append(
+                node.get('prefix', '') + label + node.get('suffix', '.'))
+        width_labels = max(len(label) for label in labels) + 1
+        labels = [label.ljust(width_labels) for label in labels]
+        return self.list_items(node, labels, width)
+
+    def list_items(self, node, labels, width):
+        """Render the items of a list, prefixed with `labels`."""
+        items = [
+            indent(self.blocks(item, width - len(label)) or [''], label)
+            for item, label in zip(node.children, labels)
+            ]
+        # Lists of single paragraphs are compact, as in Sphinx
+        compact = all(
+            len(item.children) <= 1
+            and all(isinstance(child, nodes.paragraph) for child in item)
+            for item in node.children)
+        return join_blocks(items, not compact)
+
+    def block_definition_list(self, node, width):
+        return join_blocks(
+            [self.block(item, width) for item in node.children], False)
+
+    def block_definition_list_item(self, node, width):
+        term = ' : '.join(
+            self.inline(child) for child in node.children
+            if isinstance(child, (nodes.term, nodes.classifier)))
+        lines = wrap(term, width)
+        for child in node.children:
+            if isinstance(child, nodes.definition):
+                lines += indent(
+                    self.blocks(child, width - INDENT), ' ' * INDENT)
+        return lines
+
+    def block_field_list(self, node, width):
+        return join_blocks(
+            [self.block(field, width) for field in node.children], False)
+
+    def block_field(self, node, width):
+        name, field_body = node.children
+        name = self.inline(name) + ':'
+        if (len(field_body.children) == 1
+                and isinstance(field_body[0], nodes.paragraph)):
+            text = name + ' ' + self.inline(field_body[0])
+            return indent(wrap(text, width - INDENT), '', INDENT)
+        return [name] + indent(
+            self.blocks(field_body, width - INDENT), ' ' * INDENT)
+
+    def block_option_list(self, node, width):
+        return join_blocks(
+            [self.block(item, width) for item in node.children], False)
+
+    def block_option_list_item(self, node, width):
+        group, description = node.children
+        options = ', '.join(self.inline(option) for option in group)
+        return [options] + indent(
+            self.blocks(description, width - INDENT), ' ' * INDENT)
+
+    def block_block_quote(self, node, width):
+        return indent(self.blocks(node, width - INDENT), ' ' * INDENT)
+
+    def block_attribution(self, node, width):
+        return indent(wrap(self.inline(node), width - 3), '-- ')
+
+    def block_literal_block(self, node, width):
+        if 'parsed-literal' in node.get('classes', []):
+            text = self.inline(node)
+        else:
+            text = node.astext()
+        return indent(text.splitlines(), ' ' * INDENT)
+
+    block_math_block = block_literal_block
+
+    def block_doctest_block(self, node, width):
+        return node.astext().splitlines()
+
+    def block_line_block(self, node, width):
+        lines = []
+        for child in node.children:
+            if isinstance(child, nodes.line_block):
+                lines += indent(self.block_line_block(child, width),
+                                ' ' * INDENT)
+            else:
+                lines.append(self.inline(child))
+        return lines
+
+    def block_transition(self, node, width):
+        return ['-' * width]
+
+    def admonition(self, node, width):
+        """Render a note, warning, etc."""
+        if node.children and isinstance(node[0], nodes.title):
+            label = self.inline(node[0])
+        else:
+            label = node.tagname.capitalize()
+        body = [child for child in node.children
+                if not isinstance(child, nodes.title)]
+        lines = join_blocks(
+            [self.block(child, width - INDENT) for child in body])
+        return ([self.style(label + ':', 'label')]
+                + indent(lines, ' ' * INDENT))
+
+    def block_topic(self, node, width):
+        return self.admonition(node, width)
+
+    def block_footnote(self, node, width):
+        label = '[%s] ' % self.inline(node[0]) if node.children else ''
+        lines = self.blocks(
+            nodes.Element('', *node.children[1:]), width - len(label))
+        return indent(lines or [''], label)
+
+    block_citation = block_footnote
+
+    def block_image(self, node, width):
+        alt = node.get('alt')
+        return [('[image: %s]' % alt) if alt else '[image]']
+
+    def block_table(self, node, width):
+        rows = []
+        header_rows = 0
+        findall = getattr(node, 'findall', None) or node.traverse
+        for row in findall(nodes.row):
+            rows.append([
+                ' '.join(self.blocks(entry, width, False))
+                for entry in row.children
+                ])
+            if isinstance(row.parent, nodes.thead):
+                header_rows += 1
+        if not rows:
+            return []
+
+        columns = max(len(row) for row in rows)
+        widths = [
+            max(visible_len(row[i]) for row in rows if i < len(row))
+            for i in range(columns)
+            ]
+        border = '  '.join('=' * column_width for column_width in widths)
+        lines = [border]
+        for number, row in enumerate(rows):
+            if number and number == header_rows:
+                lines.append(border)
+            lines.append('  '.join(
+                cell + ' ' * (column_width - visible_len(cell))
+                for cell, column_width in zip(row, widths)).rstrip())
+        lines.append(border)
+        return lines
+
+    # ---- Inline text
+
+    def inline(self, node):
+        """Render an inline node (or the inline children of a block)."""
+        if isinstance(node, nodes.Text):
+            return node.astext()
+        if isinstance(node, SKIPPED_NODES):
+            return ''
+        method = getattr(self, 'inline_' + node.tagname, None)
+        if method is not None:
+            return method(node)
+        return self.inline_children(node)
+
+    def inline_children(self, node):
+        return ''.join(self.inline(child) for child in node.children)
+
+    def inline_emphasis(self, node):
+        return self.style(self.inline_children(node), 'emphasis')
+
+    inline_title_reference = inline_emphasis
+
+    def inline_strong(self, node):
+        return self.style(self.inline_children(node), 'strong')
+
+    def inline_literal(self, node):
+        return self.style(self.inline_children(node), 'literal')
+
+    def inline_reference(self, node):
+        text = self.inline_children(node)
+        uri = node.get('refuri')
+        if uri and uri != node.astext() and not uri.startswith('mailto:'):
+            text += ' (%s)' % uri
+        return text
+
+    def inline_footnote_reference(self, node):
+        return '[%s]' % self.inline_children(node)
+
+    inline_citation_reference = inline_footnote_reference
+
+    def inline_problematic(self, node):
+        return node.rawsource or self.inline_children(node)
+
+    def inline_image(self, node):
+        return self.block_image(node, self.width)[0]
+
+
+#-----------------------------------------------------------------------------
+# Rendering
+#-----------------------------------------------------------------------------
+def render_text(docstring, width=None, ansi=False):
+    """
+    Render `docstring` to plain text with docutils.
+
+    Parameters
+    ----------
+    docstring : str
+        A reST-formatted docstring
+
+    width : int, optional
+        Maximum length of the lines (except for literal blocks and tables).
+        If None, the width of the terminal is used.
+
+    ansi : bool
+        Whether to style titles, emphasis, literals, etc with ANSI escape
+        codes, instead of marking them as Sphinx's text builder does.
+
+    Returns
+    -------
+    The docstring, as text.
+    """
+    if width is None:
+        width = shutil.get_terminal_size().columns
+    # Avoid degenerate wrapping in very narrow terminals
+    width = max(width, 20)
+
+    doctree = publish_doctree(
+        docstring, parser=Parser(), settings_overrides=SETTINGS)
+    return TextTranslator(width, ansi).render(doctree)
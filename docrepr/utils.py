@@ -6,7 +6,12 @@
 """Utilities (adapted from Spyder source code)."""
 
 # Standard library modules
+import base64
 import locale
+import mimetypes
+import os
+import os.path as osp
+import re
 import shutil
 import sys
 from pathlib import Path
@@ -65,3 +70,73 @@ def merge_directories(source, destination):
         else:
             if not destination_item.exists():
                 shutil.copy2(source_item, destination_item)
+
+
+def link_file(source, destination):
+    """
+    Place `source` at `destination` as a hard link, replacing it if needed.
+
+    The file is copied instead where hard links are not supported (e.g.
+    across file systems).
+    """
+    try:
+        os.remove(destination)
+    except OSError:
+        pass
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def link_tree(source, destination):
+    """Place all files of a source dir in a dest dir, using `link_file`."""
+    for root, dirs, files in os.walk(source):
+        target_root = osp.normpath(
+            osp.join(destination, osp.relpath(root, source)))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            link_file(osp.join(root, name), osp.join(target_root, name))
+
+
+#==============================================================================
+# Asset functions
+#==============================================================================
+
+def minify_css(css, base_dir=None):
+    """
+    Remove comments and extra whitespace from a stylesheet.
+
+    If `base_dir` is given, images referenced with relative urls are
+    inlined as data URIs, so the stylesheet can be embedded in a page.
+    """
+    css = re.sub(r'/\*.*?\*/|@charset[^;]*;', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r' ?([{};,>]) ?', r'\1', css)
+    css = css.replace(': ', ':').replace(';}', '}')
+
+    def inline_image(match):
+        path = osp.normpath(osp.join(base_dir, match.group(1)))
+        mimetype = mimetypes.guess_type(path)[0]
+        try:
+            with open(path, 'rb') as image:
+                data = base64.b64encode(image.read()).decode('ascii')
+        except OSError:
+            return match.group(0)
+        return 'url(data:%s;base64,%s)' % (mimetype, data)
+
+    if base_dir is not None:
+        css = re.sub(r'url\((?!data:)([^:)]+)\)', inline_image, css)
+    return css.strip()
+
+
+def minify_js(js):
+    """
+    Remove comment lines, indentation and blank lines from a script.
+
+    Line breaks are kept, so this is safe for scripts that rely on automatic
+    semicolon insertion, but comments must be on lines of their own.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(
+        line for line in lines if line and not line.startswith('//'))